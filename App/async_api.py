@@ -0,0 +1,170 @@
+import contextvars
+import re
+from urllib.parse import parse_qs
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from App.database import db, sqlite_pragmas
+from App.models import Request, LoggedHours
+from App.controllers.pagination import clamp_page_size, keyset_select, keyset_page
+from App.controllers.leaderboard_controller import leaderboard_select, ranked
+from App.controllers.student_controller import student_summary_select, student_summary_json
+from App.controllers.user import parse_leaderboard_cursor, leaderboard_page_json
+
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+
+
+def async_database_url(url):
+    """Swap the driver of a SQLAlchemy URL for its asyncio counterpart."""
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for {backend!r} databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_async_db(app):
+    """Create an asyncio engine and session factory for the app's database.
+
+    The URL is the one Flask-SQLAlchemy resolved, so relative SQLite paths
+    point at the same file. Server databases get the same pool settings as
+    the sync engine; SQLite connections get the same pragmas.
+    """
+    with app.app_context():
+        url = async_database_url(db.engine.url)
+    options = {key: value for key, value in app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}).items()
+               if key in ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle', 'pool_pre_ping')}
+    engine = create_async_engine(url, **options)
+
+    if url.get_backend_name() == 'sqlite' and app.config.get('SQLITE_TUNING', True):
+        pragmas = sqlite_pragmas(app.config)
+
+        @event.listens_for(engine.sync_engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def leaderboard_page(session, limit=None, after=None):
+    limit = clamp_page_size(limit)
+    rows = (await session.execute(leaderboard_select(limit + 1, parse_leaderboard_cursor(after)))).all()
+    return leaderboard_page_json(ranked(rows), limit)
+
+
+async def student_summary(session, student_id):
+    row = (await session.execute(student_summary_select(student_id))).first()
+    return student_summary_json(row) if row else None
+
+
+async def _json_page(session, model, key_column, limit, after):
+    limit = clamp_page_size(limit)
+    rows = (await session.scalars(keyset_select(db.select(model), key_column, limit, after))).all()
+    rows, next_cursor = keyset_page(rows, key_column, limit)
+    return {'items': [row.get_json() for row in rows], 'next_cursor': next_cursor}
+
+
+async def requests_page(session, limit=None, after=None):
+    return await _json_page(session, Request, Request.id, limit, after)
+
+
+async def logged_hours_page(session, limit=None, after=None):
+    return await _json_page(session, LoggedHours, LoggedHours.id, limit, after)
+
+
+def _wsgi_fallback(app):
+    """Wrap the Flask app for ASGI, or return None when asgiref is not installed."""
+    try:
+        from asgiref.sync import sync_to_async
+        from asgiref.wsgi import WsgiToAsgiInstance
+    except ImportError:
+        return None
+
+    class ThreadedWsgiInstance(WsgiToAsgiInstance):
+        # asgiref runs every WSGI call on one shared thread by default; use the loop's pool instead
+        run_wsgi_app = sync_to_async(WsgiToAsgiInstance.__dict__['run_wsgi_app'].func, thread_sensitive=False)
+
+    def wsgi_app(environ, start_response):
+        # start from an empty context so each request pushes its own app context and session
+        # instead of sharing the one create_app() left pushed, which asgiref copies into every thread
+        return contextvars.Context().run(app, environ, start_response)
+
+    async def fallback(scope, receive, send):
+        await ThreadedWsgiInstance(wsgi_app)(scope, receive, send)
+    return fallback
+
+
+class AsyncReadAPI:
+    """ASGI app serving the read-heavy JSON endpoints from an asyncio engine.
+
+    The leaderboard, student summary, requests and logged hours pages under
+    `prefix`/api are answered on the event loop, so one process can hold
+    many slow or long-polling readers open at once. They run the queries the
+    synchronous controllers build, against the same models. Every other path
+    goes to the Flask app through asgiref's WSGI adapter when asgiref is
+    installed.
+    """
+
+    def __init__(self, app, prefix='/async'):
+        self.app = app
+        self.engine, self.sessionmaker = create_async_db(app)
+        self.fallback = _wsgi_fallback(app)
+        self.routes = [
+            (re.compile(prefix + r'/api/leaderboard'), self.paged(leaderboard_page)),
+            (re.compile(prefix + r'/api/students/(?P<student_id>\d+)/summary'), self.summary),
+            (re.compile(prefix + r'/api/requests'), self.paged(requests_page)),
+            (re.compile(prefix + r'/api/logged_hours'), self.paged(logged_hours_page)),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] == 'http':
+            for pattern, handler in self.routes:
+                match = pattern.fullmatch(scope['path'])
+                if match:
+                    if scope['method'] not in ('GET', 'HEAD'):
+                        return await self._send_json(send, 405, {'message': 'Method not allowed'})
+                    args = {key: values[-1] for key, values in parse_qs(scope['query_string'].decode()).items()}
+                    status, body = await handler(args, **match.groupdict())
+                    return await self._send_json(send, status, body, head=scope['method'] == 'HEAD')
+        if self.fallback is not None:
+            return await self.fallback(scope, receive, send)
+        await self._send_json(send, 404, {'message': 'Not found'})
+
+    def paged(self, fetch_page):
+        async def handler(args):
+            limit = args.get('limit')
+            limit = int(limit) if limit and limit.lstrip('-').isdigit() else None
+            try:
+                async with self.sessionmaker() as session:
+                    return 200, await fetch_page(session, limit=limit, after=args.get('after'))
+            except ValueError:
+                return 400, {'message': 'Invalid pagination cursor'}
+        return handler
+
+    async def summary(self, args, student_id):
+        async with self.sessionmaker() as session:
+            summary = await student_summary(session, int(student_id))
+        if summary is None:
+            return 404, {'message': 'Student not found'}
+        return 200, summary
+
+    async def _send_json(self, send, status, body, head=False):
+        payload = self.app.json.dumps(body).encode()
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(payload)).encode())]})
+        await send({'type': 'http.response.body', 'body': b'' if head else payload})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
@@ -0,0 +1,233 @@
+import pickle
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+
+from App.database import db
+
+
+class MemoryBackend:
+    """In-process LRU store with per-entry expiry.
+
+    Each gunicorn worker has its own copy, so a write in one worker only
+    clears that worker's entries; the others stop reading theirs because
+    ResultCache keys include the data version.
+    Values are returned as stored, so callers must treat them as read-only.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[1] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return item
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """Cache store in a local SQLite file shared by every worker on the host.
+
+    Values are pickled. Expired rows are purged every `purge_every` writes.
+    """
+
+    def __init__(self, path, purge_every=500):
+        self.path = path
+        self.purge_every = purge_every
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires REAL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return pickle.loads(row[0]), row[1]
+
+    def set(self, key, value, ttl):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                         (key, pickle.dumps(value), time.time() + ttl))
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                conn.execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+
+    def delete_prefix(self, prefix):
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE key LIKE ? ESCAPE '\\'", (escaped + '%',))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache")
+
+
+class NullBackend:
+    """Caches nothing; used when CACHE_BACKEND is 'none' or outside an app."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete_prefix(self, prefix):
+        pass
+
+    def clear(self):
+        pass
+
+
+class ResultCache:
+    """Namespaced read-through cache over a backend, with hit/miss counters.
+
+    Entries are keyed "<namespace>:<key>" so a write can drop every entry
+    of a namespace at once. With a `version` callable the key also holds
+    the data version it returns: a write in another process can't clear
+    this process's memory backend, but it bumps the version, so entries
+    read before it are never served after it commits.
+    """
+
+    def __init__(self, backend, default_ttl=30, version=None):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.version = version
+        self._lock = Lock()
+        self._counts = {}
+
+    def _count(self, namespace, index):
+        with self._lock:
+            self._counts.setdefault(namespace, [0, 0])[index] += 1
+
+    def get_or_set(self, namespace, key, compute, ttl=None):
+        full_key = f"{namespace}:{self.version()}:{key}" if self.version else f"{namespace}:{key}"
+        item = self.backend.get(full_key)
+        if item is not None:
+            self._count(namespace, 0)
+            return item[0]
+        self._count(namespace, 1)
+        value = compute()
+        self.backend.set(full_key, value, self.default_ttl if ttl is None else ttl)
+        return value
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            self.backend.delete_prefix(f"{namespace}:")
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            return {namespace: {'hits': hits, 'misses': misses} for namespace, (hits, misses) in self._counts.items()}
+
+    def metrics_lines(self):
+        lines = []
+        for name, index, help_text in (('app_cache_hits_total', 'hits', 'Result cache hits'),
+                                       ('app_cache_misses_total', 'misses', 'Result cache misses')):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for namespace, counts in sorted(self.stats().items()):
+                lines.append(f'{name}{{namespace="{namespace}"}} {counts[index]}')
+        return lines
+
+
+_null_cache = ResultCache(NullBackend())
+
+
+def get_cache():
+    """Return the current app's result cache, or a no-op cache outside an app."""
+    if has_app_context():
+        return current_app.extensions.get('result_cache', _null_cache)
+    return _null_cache
+
+
+def cached(namespace, key, compute, ttl=None):
+    return get_cache().get_or_set(namespace, key, compute, ttl)
+
+
+def invalidate_cache(*namespaces):
+    """Drop cached results for `namespaces` now and again once the transaction commits.
+
+    Clearing after commit stops a concurrent reader from re-caching the
+    pre-commit rows in between; clearing now keeps reads later in this
+    request consistent with its own writes.
+    """
+    get_cache().invalidate(*namespaces)
+    db.session.info.setdefault('cache_invalidate', set()).update(namespaces)
+
+
+def _invalidate_after_commit(session):
+    namespaces = session.info.pop('cache_invalidate', None)
+    if namespaces:
+        get_cache().invalidate(*namespaces)
+
+
+def _discard_invalidations(session):
+    session.info.pop('cache_invalidate', None)
+
+
+def init_cache(app):
+    """Create the result cache selected by CACHE_BACKEND ('memory', 'sqlite' or 'none').
+
+    Entries are keyed by the hours data version, which every tracked write
+    bumps, so other workers stop serving them as soon as that write commits.
+    Hit and miss counters are added to /metrics when instrumentation is on.
+    """
+    backend_name = app.config.get('CACHE_BACKEND', 'memory')
+    if backend_name == 'memory':
+        backend = MemoryBackend(app.config.get('CACHE_MAX_ENTRIES', 1024))
+    elif backend_name == 'sqlite':
+        backend = SQLiteBackend(app.config.get('CACHE_SQLITE_PATH', 'cache.db'))
+    elif backend_name == 'none':
+        backend = NullBackend()
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND {backend_name!r}")
+
+    version = None
+    if backend_name != 'none':
+        from App.controllers.data_version_controller import get_data_version
+        version = lambda: get_data_version()[0]
+    cache = ResultCache(backend, app.config.get('CACHE_DEFAULT_TTL', 30), version)
+    app.extensions['result_cache'] = cache
+
+    metrics = app.extensions.get('route_metrics')
+    if metrics is not None:
+        metrics.add_collector(cache.metrics_lines)
+
+    for name, listener in (('after_commit', _invalidate_after_commit), ('after_rollback', _discard_invalidations)):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+    return cache
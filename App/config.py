@@ -1,5 +1,30 @@
 import os
 
+from App.instrumentation import InstrumentedQueuePool
+from App.database import REPLICA_BIND
+
+
+def engine_options_from_env():
+    """Build SQLALCHEMY_ENGINE_OPTIONS for a pooled server database from the environment.
+
+    DB_POOL_SIZE and DB_MAX_OVERFLOW bound the connections each worker
+    process opens; with gevent workers every greenlet queues on this pool
+    rather than opening its own connection. DB_STATEMENT_TIMEOUT_MS is
+    passed to Postgres as statement_timeout.
+    """
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+    statement_timeout = os.environ.get('DB_STATEMENT_TIMEOUT_MS')
+    if statement_timeout:
+        options['connect_args'] = {'options': f"-c statement_timeout={int(statement_timeout)}"}
+    return options
+
 def load_config(app, overrides):
     if os.path.exists(os.path.join('./App', 'custom_config.py')):
         app.config.from_object('App.custom_config')
@@ -17,4 +42,15 @@ def load_config(app, overrides):
     app.config["JWT_COOKIE_CSRF_PROTECT"] = False
     app.config['FLASK_ADMIN_SWATCH'] = 'darkly'
     for key in overrides:
-        app.config[key] = overrides[key]
\ No newline at end of file
+        app.config[key] = overrides[key]
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            **engine_options_from_env(),
+            **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        }
+    replica_url = app.config.get('REPLICA_DATABASE_URL')
+    if replica_url:
+        if replica_url.startswith('postgres://'):
+            replica_url = replica_url.replace('postgres://', 'postgresql://', 1)
+        replica = replica_url if replica_url.startswith('sqlite') else {'url': replica_url, **engine_options_from_env()}
+        app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}), REPLICA_BIND: replica}
@@ -6,3 +6,9 @@ from .accolade_controller import *
 from .activity_controller import *
 from .staff_controller import *
 from .student_controller import *
+from .hours_controller import *
+from .leaderboard_controller import *
+from .milestone_controller import *
+from .ledger_controller import *
+from .data_version_controller import *
+from .roster_controller import *
\ No newline at end of file
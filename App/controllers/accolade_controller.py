@@ -1,5 +1,7 @@
-from App.database import db
+from App.database import db, begin_write
 from App.models import Accolade, Student
+from App.controllers.ledger_controller import adjust_accolade_count
+from App.cache import invalidate_cache
 from datetime import datetime
 import uuid
 
@@ -8,6 +10,7 @@ def generate_unique_accolade_id():
 
 def create_accolade(name, milestone):
     """Create a new accolade template"""
+    begin_write()
     accoladeID = generate_unique_accolade_id()
     new_accolade = Accolade(accoladeID=accoladeID, studentID=None, name=name, milestoneHours=milestone)
     db.session.add(new_accolade)
@@ -15,13 +18,32 @@ def create_accolade(name, milestone):
     return new_accolade
 
 def award_accolade(studentID, accoladeID):
-    """Award an existing accolade to a student"""
+    """Award an existing accolade to a student.
+
+    Returns None if the accolade doesn't exist or the student already
+    holds another accolade for the same milestone.
+    """
+    begin_write()
     accolade = Accolade.query.filter_by(accoladeID=accoladeID).first()
     if not accolade:
         return None
+    if accolade.milestoneHours is not None and db.session.scalar(
+        db.select(Accolade.accoladeID).filter(
+            Accolade.studentID == studentID,
+            Accolade.milestoneHours == accolade.milestoneHours,
+            Accolade.accoladeID != accoladeID
+        ).limit(1)
+    ) is not None:
+        db.session.rollback()
+        return None
     
+    if accolade.studentID != studentID:
+        if accolade.studentID is not None:
+            adjust_accolade_count(accolade.studentID, -1)
+        adjust_accolade_count(studentID, 1)
     accolade.studentID = studentID
     accolade.dateAwarded = datetime.utcnow()
+    invalidate_cache('accolades')
     db.session.commit()
     return accolade
 
@@ -35,8 +57,12 @@ def get_all_accolades():
 
 def delete_accolade(accoladeID):
     """Delete an accolade"""
+    begin_write()
     accolade = Accolade.query.filter_by(accoladeID=accoladeID).first()
     if accolade:
+        if accolade.studentID is not None:
+            adjust_accolade_count(accolade.studentID, -1)
+        invalidate_cache('accolades')
         db.session.delete(accolade)
         db.session.commit()
         return True
@@ -1,5 +1,6 @@
-from App.database import db
+from App.database import db, begin_write
 from App.models import Activity, Student
+from App.controllers.ledger_controller import credit_hours
 from datetime import datetime
 import uuid
 
@@ -8,6 +9,7 @@ def generate_unique_log_id():
 
 def create_activity_log(studentID, hours, description):
     """Create a new activity log for a student"""
+    begin_write()
     logID = generate_unique_log_id()
     new_log = Activity(logID=logID, studentID=studentID, hoursLogged=hours, description=description)
     db.session.add(new_log)
@@ -16,10 +18,13 @@ def create_activity_log(studentID, hours, description):
 
 def update_activity_status(logID, newStatus):
     """Update the status of an activity log"""
+    begin_write()
     activity = Activity.query.filter_by(logID=logID).first()
     if not activity:
         return None
     
+    if activity.status != newStatus and 'Confirmed' in (activity.status, newStatus):
+        credit_hours(activity.studentID, activity.hoursLogged if newStatus == 'Confirmed' else -activity.hoursLogged)
     activity.status = newStatus
     db.session.commit()
     return activity
@@ -38,8 +43,11 @@ def get_activity_by_id(logID):
 
 def delete_activity(logID):
     """Delete an activity log"""
+    begin_write()
     activity = Activity.query.filter_by(logID=logID).first()
     if activity:
+        if activity.status == 'Confirmed':
+            credit_hours(activity.studentID, -activity.hoursLogged)
         db.session.delete(activity)
         db.session.commit()
         return True
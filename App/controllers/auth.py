@@ -1,7 +1,9 @@
+from flask import session
 from flask_jwt_extended import create_access_token, jwt_required, JWTManager, get_jwt_identity, verify_jwt_in_request
 
 from App.models import User
 from App.database import db
+from App.controllers.session_auth import get_request_user, check_credentials
 
 
 def authenticate_user(username, password):
@@ -11,7 +13,7 @@ def authenticate_user(username, password):
   """
   result = db.session.execute(db.select(User).filter_by(username=username))
   user = result.scalar_one_or_none()
-  if user and user.check_password(password):
+  if check_credentials(user, password):
     return user
   return None
 
@@ -48,7 +50,7 @@ def setup_jwt(app):
       user_id = int(identity)
     except (TypeError, ValueError):
       return None
-    return db.session.get(User, user_id)
+    return get_request_user(user_id)
 
   return jwt
 
@@ -57,14 +59,15 @@ def setup_jwt(app):
 def add_auth_context(app):
   @app.context_processor
   def inject_user():
+      # Session-authenticated pages never need the JWT checked
+      if session.get('user_id'):
+          current_user = get_request_user(session['user_id'])
+          return dict(is_authenticated=current_user is not None, current_user=current_user)
       try:
-          verify_jwt_in_request()
+          verify_jwt_in_request(optional=True)
           identity = get_jwt_identity()
           user_id = int(identity) if identity is not None else None
-          current_user = db.session.get(User, user_id) if user_id is not None else None
-          is_authenticated = current_user is not None
-      except Exception as e:
-          print(e)
-          is_authenticated = False
-          current_user = None
-      return dict(is_authenticated=is_authenticated, current_user=current_user)
\ No newline at end of file
+      except Exception:
+          user_id = None
+      current_user = get_request_user(user_id)
+      return dict(is_authenticated=current_user is not None, current_user=current_user)
\ No newline at end of file
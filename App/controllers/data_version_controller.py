@@ -0,0 +1,76 @@
+from App.database import db, replica_reads
+from App.models import DataVersion, LoggedHours, Request, Accolade, Activity, LeaderBoardEntry, User, Student, Staff
+from datetime import datetime
+from sqlalchemy import event
+
+HOURS_DATA = 'hours'
+
+# Writes to these models change what the leaderboard and list endpoints return;
+# users are included because usernames are shown on the leaderboard
+_TRACKED_MODELS = (LoggedHours, Request, Accolade, Activity, LeaderBoardEntry, User, Student, Staff)
+_TRACKED_TABLES = {model.__table__.name for model in _TRACKED_MODELS}
+
+
+@replica_reads
+def get_data_version(name=HOURS_DATA):
+    """Return (version, updated) for a data set; (0, None) before its first write.
+
+    Read from the replica when there is one, like the bodies it tags, so an
+    ETag or cache key never claims a version newer than a lagging replica's
+    data.
+    """
+    row = db.session.execute(
+        db.select(DataVersion.version, DataVersion.updated).filter(DataVersion.name == name)
+    ).first()
+    return (row.version, row.updated) if row else (0, None)
+
+
+def bump_data_version(name=HOURS_DATA):
+    """Increment a data set's version in the current transaction."""
+    now = datetime.utcnow()
+    result = db.session.execute(
+        db.update(DataVersion).where(DataVersion.name == name)
+        .values(version=DataVersion.version + 1, updated=now)
+    )
+    if result.rowcount == 0:
+        db.session.add(DataVersion(name, version=1, updated=now))
+        db.session.flush()
+
+
+def _mark_flushed_changes(session, flush_context, instances):
+    if any(isinstance(obj, _TRACKED_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['data_changed'] = True
+
+
+def _mark_bulk_changes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if getattr(table, 'name', None) in _TRACKED_TABLES:
+            orm_execute_state.session.info['data_changed'] = True
+
+
+def _bump_before_commit(session):
+    # commit() only flushes after this hook runs, so flush here to see pending changes
+    session.flush()
+    if session.info.pop('data_changed', False):
+        bump_data_version()
+
+
+def _discard_changes(session):
+    session.info.pop('data_changed', None)
+
+
+def track_data_version():
+    """Bump the hours data version in any transaction that writes a tracked model.
+
+    ORM flushes and bulk insert/update/delete statements both count. The
+    bump happens just before commit, so the version row is locked for as
+    short a time as possible and a rollback undoes it with the rest of the
+    transaction.
+    """
+    for name, listener in (('before_flush', _mark_flushed_changes),
+                           ('do_orm_execute', _mark_bulk_changes),
+                           ('before_commit', _bump_before_commit),
+                           ('after_rollback', _discard_changes)):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
@@ -0,0 +1,17 @@
+from App.database import db
+from App.models import LoggedHours
+from sqlalchemy import func
+
+
+def get_approved_hours_totals(student_ids=None):
+    """Return {student_id: approved logged hours} in a single query.
+
+    Pass None to total every student. Students with no approved hours are
+    left out of the result.
+    """
+    stmt = db.select(LoggedHours.student_id, func.sum(LoggedHours.hours)) \
+        .filter(LoggedHours.status == 'approved') \
+        .group_by(LoggedHours.student_id)
+    if student_ids is not None:
+        stmt = stmt.filter(LoggedHours.student_id.in_(student_ids))
+    return {student_id: (hours or 0) for student_id, hours in db.session.execute(stmt)}
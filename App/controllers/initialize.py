@@ -1,5 +1,6 @@
 from App.models import User, Student, Staff, Request
 from App.database import db
+from App.cache import invalidate_cache
 
 
 def initialize_db(drop_first=True):
@@ -84,6 +85,10 @@ def initialize_db(drop_first=True):
 
     db.session.commit()
 
+    from App.controllers.ledger_controller import recompute_student_totals
+    recompute_student_totals()
+    invalidate_cache('leaderboard', 'students', 'staff', 'accolades')
+
     # Return ids for reference
     result = {
         'students': [s.user_id for s in students],
@@ -95,6 +100,92 @@ def initialize_db(drop_first=True):
     return result
 
 
+def generate_synthetic_data(students=1000, staff=50, logged_hours=20000, requests=5000,
+                            activities=5000, accolades=1000, seed=42, batch_size=10000):
+    """Bulk-load a deterministic synthetic dataset for benchmarking.
+
+    Rows are appended to whatever is already in the database using
+    executemany inserts of `batch_size` rows, so millions of rows load
+    without building ORM objects. The same `seed` always produces the same
+    data. Every generated user shares one password hash ("password") since
+    hashing per row would dominate the load time.
+
+    Returns a dict with the number of rows created per table.
+    """
+    import random
+    import uuid
+    from datetime import datetime, timedelta
+    from sqlalchemy import func
+    from App.passwords import hash_password
+    from App.models import LoggedHours, Activity, Accolade
+    from App.controllers.ledger_controller import recompute_student_totals
+    from App.controllers.milestone_controller import MILESTONE_HOURS, milestone_name
+
+    rng = random.Random(seed)
+    password = hash_password("password")
+    start = datetime(2024, 1, 1)
+    span = 365 * 24 * 3600
+    first_id = (db.session.scalar(db.select(func.max(User.user_id))) or 0) + 1
+
+    def in_batches(rows, table):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                db.session.execute(db.insert(table), batch)
+                batch = []
+        if batch:
+            db.session.execute(db.insert(table), batch)
+
+    def moment():
+        return start + timedelta(seconds=rng.randrange(span))
+
+    student_ids = list(range(first_id, first_id + students))
+    staff_ids = list(range(first_id + students, first_id + students + staff))
+
+    in_batches(({'user_id': i, 'username': f"student{i}", 'email': f"student{i}@example.com",
+                 'password': password, 'role': 'student'} for i in student_ids), User.__table__)
+    in_batches(({'student_id': i, 'totalHours': 0, 'points': 0, 'pendingHours': 0, 'accoladeCount': 0} for i in student_ids), Student.__table__)
+    in_batches(({'user_id': i, 'username': f"staff{i}", 'email': f"staff{i}@example.com",
+                 'password': password, 'role': 'staff'} for i in staff_ids), User.__table__)
+    in_batches(({'staff_id': i} for i in staff_ids), Staff.__table__)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        # explicit ids do not advance the serial sequence
+        db.session.execute(db.text(
+            "SELECT setval(pg_get_serial_sequence('users', 'user_id'), (SELECT MAX(user_id) FROM users))"
+        ))
+
+    in_batches(({'student_id': rng.choice(student_ids), 'staff_id': rng.choice(staff_ids),
+                 'hours': rng.choice([0.5, 1.0, 1.5, 2.0, 3.0, 4.0]),
+                 'status': 'approved' if rng.random() < 0.9 else 'pending',
+                 'timestamp': moment()} for _ in range(logged_hours)), LoggedHours.__table__)
+    in_batches(({'student_id': rng.choice(student_ids), 'hours': rng.choice([1.0, 2.0, 2.5, 5.0, 8.0]),
+                 'status': rng.choice(['pending', 'pending', 'approved', 'denied']),
+                 'timestamp': moment()} for _ in range(requests)), Request.__table__)
+    in_batches(({'logID': str(uuid.UUID(int=rng.getrandbits(128))), 'studentID': rng.choice(student_ids),
+                 'hoursLogged': rng.randint(1, 6), 'dateLogged': moment(),
+                 'status': rng.choice(['Pending', 'Confirmed', 'Confirmed', 'Rejected']),
+                 'description': 'Generated activity'} for _ in range(activities)), Activity.__table__)
+    # each (student, milestone) pair can only be awarded once
+    pairs = rng.sample(range(students * len(MILESTONE_HOURS)), min(accolades, students * len(MILESTONE_HOURS)))
+    in_batches(({'accoladeID': str(uuid.UUID(int=rng.getrandbits(128))), 'studentID': student_ids[p // len(MILESTONE_HOURS)],
+                 'name': milestone_name(MILESTONE_HOURS[p % len(MILESTONE_HOURS)]),
+                 'milestoneHours': MILESTONE_HOURS[p % len(MILESTONE_HOURS)], 'dateAwarded': moment()}
+                for p in pairs), Accolade.__table__)
+    db.session.commit()
+    recompute_student_totals()
+    invalidate_cache('leaderboard', 'students', 'staff', 'accolades')
+
+    return {
+        'students': students,
+        'staff': staff,
+        'logged_hours': logged_hours,
+        'requests': requests,
+        'activities': activities,
+        'accolades': len(pairs)
+    }
+
+
 def initialize(drop_first=True):
     """Compatibility wrapper used by CLI (keeps previous name `initialize`)."""
     return initialize_db(drop_first=drop_first)
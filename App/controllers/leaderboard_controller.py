@@ -0,0 +1,147 @@
+from App.database import db
+from App.models import Student, Activity, LeaderBoardEntry
+from App.controllers.hours_controller import get_approved_hours_totals
+from App.cache import invalidate_cache
+from sqlalchemy import func, bindparam
+import uuid
+
+
+def _compute_approved_totals(student_ids=None):
+    """Sum approved logged hours and confirmed activity hours per student.
+
+    Only used to seed or repair leaderboard entries; normal reads go through
+    the materialized LeaderBoardEntry rows.
+    """
+    totals = get_approved_hours_totals(student_ids)
+    confirmed = db.select(Activity.studentID, func.sum(Activity.hoursLogged)) \
+        .filter(Activity.status == 'Confirmed') \
+        .group_by(Activity.studentID)
+    if student_ids is not None:
+        confirmed = confirmed.filter(Activity.studentID.in_(student_ids))
+
+    for student_id, hours in db.session.execute(confirmed):
+        totals[student_id] = totals.get(student_id, 0) + (hours or 0)
+    return totals
+
+
+def create_leaderboard_entry(student):
+    """Attach an empty leaderboard entry to a newly registered student.
+
+    The entry is written in the caller's transaction.
+    """
+    entry = LeaderBoardEntry(studentID=student.student_id, rank=None, totalHours=0, totalAccolades=0)
+    student.leaderboard_entry = entry
+    invalidate_cache('leaderboard')
+    return entry
+
+
+def adjust_leaderboard_hours(student_id, delta):
+    """Apply a change in approved hours to a student's leaderboard entry.
+
+    Runs inside the caller's transaction; the caller is responsible for
+    committing. A missing entry is rebuilt from the student's history.
+    """
+    invalidate_cache('leaderboard')
+    result = db.session.execute(
+        db.update(LeaderBoardEntry)
+        .where(LeaderBoardEntry.studentID == student_id)
+        .values(totalHours=LeaderBoardEntry.totalHours + delta)
+    )
+    if result.rowcount == 0:
+        total = _compute_approved_totals([student_id]).get(student_id, 0)
+        db.session.add(LeaderBoardEntry(studentID=student_id, rank=None, totalHours=total, totalAccolades=0))
+
+
+def adjust_leaderboard_hours_bulk(deltas):
+    """Apply {student_id: delta} approved-hours changes in one executemany UPDATE.
+
+    Like adjust_leaderboard_hours this runs in the caller's transaction.
+    """
+    if not deltas:
+        return
+    invalidate_cache('leaderboard')
+    table = LeaderBoardEntry.__table__
+    db.session.execute(
+        table.update()
+        .where(table.c.studentID == bindparam('entry_student_id'))
+        .values(totalHours=table.c.totalHours + bindparam('delta')),
+        [{'entry_student_id': student_id, 'delta': delta} for student_id, delta in deltas.items()]
+    )
+    existing = set(db.session.scalars(
+        db.select(LeaderBoardEntry.studentID).filter(LeaderBoardEntry.studentID.in_(list(deltas)))
+    ))
+    missing = [student_id for student_id in deltas if student_id not in existing]
+    if missing:
+        totals = _compute_approved_totals(missing)
+        db.session.add_all([
+            LeaderBoardEntry(studentID=student_id, rank=None, totalHours=totals.get(student_id, 0), totalAccolades=0)
+            for student_id in missing
+        ])
+
+
+def sync_leaderboard_hours():
+    """Copy every student's stored totalHours onto their leaderboard entry.
+
+    One correlated UPDATE, plus an executemany insert for students that
+    have no entry. Runs in the caller's transaction.
+    """
+    students = Student.__table__
+    entries = LeaderBoardEntry.__table__
+    stored = db.select(students.c.totalHours).where(students.c.student_id == entries.c.studentID).scalar_subquery()
+    db.session.execute(entries.update().values(totalHours=func.coalesce(stored, 0)))
+    missing = db.session.execute(
+        db.select(students.c.student_id, students.c.totalHours)
+        .where(~db.select(entries.c.studentID).where(entries.c.studentID == students.c.student_id).exists())
+    ).all()
+    if missing:
+        db.session.execute(db.insert(LeaderBoardEntry), [
+            {'entryID': str(uuid.uuid4()), 'studentID': student_id, 'rank': None,
+             'totalHours': total or 0, 'totalAccolades': 0}
+            for student_id, total in missing
+        ])
+    invalidate_cache('leaderboard')
+
+
+def rebuild_leaderboard():
+    """Recreate every leaderboard entry from the logged hours and activities."""
+    totals = _compute_approved_totals()
+    student_ids = db.session.scalars(db.select(Student.student_id)).all()
+
+    db.session.execute(db.delete(LeaderBoardEntry))
+    db.session.add_all([
+        LeaderBoardEntry(studentID=student_id, rank=None, totalHours=totals.get(student_id, 0), totalAccolades=0)
+        for student_id in student_ids
+    ])
+    invalidate_cache('leaderboard')
+    db.session.commit()
+    return len(student_ids)
+
+
+def get_leaderboard(limit=None, after=None):
+    """Return (rank, student_id, username, total_hours) ordered by total hours.
+
+    `after` is a (total_hours, student_id) keyset cursor; rows strictly after
+    it in leaderboard order are returned. Ranks are only meaningful when
+    reading from the top of the leaderboard.
+    """
+    return ranked(db.session.execute(leaderboard_select(limit, after)).all())
+
+
+def leaderboard_select(limit=None, after=None):
+    """The (student_id, username, total_hours) query behind get_leaderboard."""
+    stmt = db.select(Student.student_id, Student.username, LeaderBoardEntry.totalHours) \
+        .join(LeaderBoardEntry, LeaderBoardEntry.studentID == Student.student_id) \
+        .order_by(LeaderBoardEntry.totalHours.desc(), LeaderBoardEntry.studentID)
+    if after is not None:
+        hours, student_id = after
+        stmt = stmt.filter(
+            (LeaderBoardEntry.totalHours < hours) |
+            ((LeaderBoardEntry.totalHours == hours) & (LeaderBoardEntry.studentID > student_id))
+        )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def ranked(rows):
+    return [(rank, student_id, username, hours) for rank, (student_id, username, hours) in enumerate(rows, 1)]
@@ -0,0 +1,168 @@
+from App.database import db
+from App.models import Student, LoggedHours, Request, Activity, Accolade
+from App.controllers.leaderboard_controller import adjust_leaderboard_hours, adjust_leaderboard_hours_bulk, sync_leaderboard_hours
+from App.controllers.milestone_controller import MILESTONE_HOURS, crossed_milestones, milestones_reached, award_milestones
+from App.cache import invalidate_cache
+from App.jobs import job_handler, enqueue_job
+from sqlalchemy import func, bindparam, cast, Integer
+
+POINTS_PER_HOUR = 10
+AWARD_MILESTONES_JOB = 'ledger.award_milestones'
+
+
+def _points_for(total):
+    """SQL expression for the points earned by `total` approved hours."""
+    return cast(total * POINTS_PER_HOUR, Integer)
+
+
+def _apply_deltas(column, deltas, with_points=False):
+    """Add {student_id: delta} to a Student counter column with one executemany UPDATE.
+
+    Each row is updated in the database as `column = column + :delta`, so
+    concurrent writers never overwrite each other's changes. Instances
+    already loaded in the session are expired so they re-read the new value.
+    """
+    if not deltas:
+        return
+    db.session.flush()
+    table = Student.__table__
+    current = func.coalesce(table.c[column], 0)
+    values = {column: current + bindparam('delta')}
+    if with_points:
+        values['points'] = _points_for(current + bindparam('delta'))
+    db.session.execute(
+        table.update().where(table.c.student_id == bindparam('ledger_student_id')).values(values),
+        [{'ledger_student_id': student_id, 'delta': delta} for student_id, delta in deltas.items()]
+    )
+    attributes = [column, 'points'] if with_points else [column]
+    for student_id in deltas:
+        student = db.session.identity_map.get(db.session.identity_key(Student, student_id))
+        if student is not None:
+            db.session.expire(student, attributes)
+
+
+def credit_hours(student_id, hours):
+    """Record a change in a student's approved hours (negative to take hours back).
+
+    Updates Student.totalHours, Student.points and the leaderboard entry in
+    the caller's transaction; the caller is responsible for committing.
+    When a gain crosses a milestone, a background job that awards it is
+    queued in the same transaction.
+    """
+    credit_hours_bulk({student_id: hours})
+
+
+def credit_hours_bulk(deltas):
+    """Apply {student_id: approved hours delta} to the student totals and leaderboard."""
+    if not deltas:
+        return
+    _apply_deltas('totalHours', deltas, with_points=True)
+    invalidate_cache('students')
+    if len(deltas) == 1:
+        student_id, hours = next(iter(deltas.items()))
+        adjust_leaderboard_hours(student_id, hours)
+    else:
+        adjust_leaderboard_hours_bulk(deltas)
+    _queue_crossed_milestones(deltas)
+
+
+def _queue_crossed_milestones(deltas):
+    """Queue the milestone award job for the students whose gain crossed a threshold."""
+    gains = {student_id: delta for student_id, delta in deltas.items() if delta > 0}
+    if not gains:
+        return
+    table = Student.__table__
+    totals = db.session.execute(
+        db.select(table.c.student_id, table.c.totalHours).filter(table.c.student_id.in_(list(gains)))
+    )
+    crossed = [student_id for student_id, total in totals
+               if crossed_milestones((total or 0) - gains[student_id], total or 0)]
+    if crossed:
+        enqueue_job(AWARD_MILESTONES_JOB, {'student_ids': crossed})
+
+
+@job_handler(AWARD_MILESTONES_JOB)
+def award_reached_milestones(student_ids):
+    """Award each student every milestone their stored total has reached that they don't hold.
+
+    Runs as a background job after hours are credited. Only milestones not
+    already held are inserted, so running it twice awards nothing more.
+    Returns {student_id: number of accolades awarded}.
+    """
+    table = Student.__table__
+    totals = db.session.execute(
+        db.select(table.c.student_id, table.c.totalHours).filter(table.c.student_id.in_(student_ids))
+    )
+    awarded = award_milestones({student_id: milestones_reached(total or 0) for student_id, total in totals})
+    if awarded:
+        _apply_deltas('accoladeCount', awarded)
+        invalidate_cache('students')
+    return awarded
+
+
+def adjust_pending_hours(student_id, hours):
+    """Add `hours` to a student's hours awaiting approval (negative once resolved)."""
+    _apply_deltas('pendingHours', {student_id: hours})
+
+
+def adjust_pending_hours_bulk(deltas):
+    """Apply {student_id: pending hours delta} in one statement."""
+    _apply_deltas('pendingHours', deltas)
+
+
+def adjust_accolade_count(student_id, count):
+    """Add `count` to the number of accolades held by a student."""
+    _apply_deltas('accoladeCount', {student_id: count})
+
+
+def award_missing_milestones(batch_size=1000):
+    """Award every milestone a student's stored total has reached but they do not hold.
+
+    Repairs accolades for hours that were written without going through
+    the ledger, such as seeded or imported data. Returns the number awarded.
+    """
+    table = Student.__table__
+    rows = db.session.execute(
+        db.select(table.c.student_id, table.c.totalHours).filter(table.c.totalHours >= MILESTONE_HOURS[0])
+    ).all()
+    awarded = 0
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        awarded += sum(award_milestones({student_id: milestones_reached(total) for student_id, total in chunk}).values())
+    return awarded
+
+
+def recompute_student_totals():
+    """Rebuild every student's running totals from the underlying rows.
+
+    Runs a correlated UPDATE over logged hours, confirmed activities and
+    pending requests, copies the rebuilt hours onto the leaderboard
+    entries, awards any milestones the rebuilt totals have reached, then
+    recounts accolades, so drift from writes that bypassed the ledger is
+    repaired in a few set-based statements. Returns the number of
+    students updated.
+    """
+    table = Student.__table__
+
+    def total_of(column, *criteria):
+        return func.coalesce(db.select(func.sum(column)).where(*criteria).scalar_subquery(), 0)
+
+    approved = total_of(LoggedHours.hours, LoggedHours.student_id == table.c.student_id,
+                        LoggedHours.status == 'approved')
+    confirmed = total_of(Activity.hoursLogged, Activity.studentID == table.c.student_id,
+                         Activity.status == 'Confirmed')
+    pending = total_of(Request.hours, Request.student_id == table.c.student_id, Request.status == 'pending')
+    accolades = db.select(func.count(Accolade.accoladeID)) \
+        .where(Accolade.studentID == table.c.student_id).scalar_subquery()
+
+    result = db.session.execute(table.update().values(
+        totalHours=approved + confirmed,
+        points=_points_for(approved + confirmed),
+        pendingHours=pending
+    ))
+    sync_leaderboard_hours()
+    award_missing_milestones()
+    db.session.execute(table.update().values(accoladeCount=accolades))
+    invalidate_cache('students')
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,86 @@
+from App.database import db
+from App.models import Accolade
+from App.cache import invalidate_cache
+from bisect import bisect_right
+from datetime import datetime
+import uuid
+
+# Hour thresholds that earn a milestone accolade, in ascending order.
+MILESTONE_HOURS = [10, 25, 50, 100]
+
+
+def milestone_name(hours):
+    return f"{hours} Hours Milestone"
+
+
+# _NAMES_REACHED[i] names the first i milestones, so per-row lookups allocate nothing
+_NAMES_REACHED = [tuple(milestone_name(m) for m in MILESTONE_HOURS[:i]) for i in range(len(MILESTONE_HOURS) + 1)]
+
+
+def milestones_reached(total_hours):
+    """Return the thresholds at or below `total_hours`."""
+    return MILESTONE_HOURS[:bisect_right(MILESTONE_HOURS, total_hours)]
+
+
+def milestone_names_reached(total_hours):
+    """Return the names of the milestones reached at `total_hours` as a shared tuple."""
+    return _NAMES_REACHED[bisect_right(MILESTONE_HOURS, total_hours)]
+
+
+def crossed_milestones(old_total, new_total):
+    """Return the thresholds reached by moving from `old_total` to `new_total`.
+
+    Only the slice of the sorted thresholds between the two totals is
+    looked at; a decrease crosses nothing.
+    """
+    if new_total <= old_total:
+        return []
+    return MILESTONE_HOURS[bisect_right(MILESTONE_HOURS, old_total):bisect_right(MILESTONE_HOURS, new_total)]
+
+
+def get_next_milestone(total_hours):
+    """Return the next threshold above `total_hours`, or the last one once all are reached."""
+    index = bisect_right(MILESTONE_HOURS, total_hours)
+    return MILESTONE_HOURS[min(index, len(MILESTONE_HOURS) - 1)]
+
+
+def get_milestone_progress(total_hours):
+    """Percent progress from the last threshold reached towards the next one."""
+    index = bisect_right(MILESTONE_HOURS, total_hours)
+    if index >= len(MILESTONE_HOURS):
+        return 100
+    previous = MILESTONE_HOURS[index - 1] if index else 0
+    target = MILESTONE_HOURS[index]
+    return min(100, int(((total_hours - previous) / (target - previous)) * 100))
+
+
+def award_milestones(crossed):
+    """Insert a milestone Accolade for each {student_id: [thresholds]} not already held.
+
+    Runs in the caller's transaction: one query for the accolades the
+    students already have and one executemany insert for the new ones.
+    Returns {student_id: number of accolades awarded}.
+    """
+    crossed = {student_id: thresholds for student_id, thresholds in crossed.items() if thresholds}
+    if not crossed:
+        return {}
+    held = set(db.session.execute(
+        db.select(Accolade.studentID, Accolade.milestoneHours)
+        .filter(Accolade.studentID.in_(list(crossed)))
+        .filter(Accolade.milestoneHours.in_({m for thresholds in crossed.values() for m in thresholds}))
+    ).tuples())
+
+    now = datetime.utcnow()
+    rows = []
+    awarded = {}
+    for student_id, thresholds in crossed.items():
+        for hours in thresholds:
+            if (student_id, hours) in held:
+                continue
+            rows.append({'accoladeID': str(uuid.uuid4()), 'studentID': student_id, 'name': milestone_name(hours),
+                         'milestoneHours': hours, 'dateAwarded': now})
+            awarded[student_id] = awarded.get(student_id, 0) + 1
+    if rows:
+        db.session.execute(db.insert(Accolade), rows)
+        invalidate_cache('accolades')
+    return awarded
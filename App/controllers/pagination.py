@@ -0,0 +1,47 @@
+from App.database import db
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def clamp_page_size(limit):
+    """Keep a client-supplied page size within 1..MAX_PAGE_SIZE."""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def parse_int_cursor(after):
+    """Decode a primary-key cursor; raises ValueError on malformed input."""
+    if after is None or after == '':
+        return None
+    return int(after)
+
+
+def keyset_select(stmt, key_column, limit, after=None):
+    """Add the keyset filter, order and limit to `stmt`, reading one row past the page."""
+    after = parse_int_cursor(after)
+    if after is not None:
+        stmt = stmt.filter(key_column > after)
+    return stmt.order_by(key_column).limit(limit + 1)
+
+
+def keyset_page(rows, key_column, limit):
+    """Trim the extra row read by keyset_select; returns (rows, next_cursor)."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = str(getattr(rows[-1], key_column.key))
+    return rows, next_cursor
+
+
+def keyset_paginate(stmt, key_column, limit=None, after=None):
+    """Fetch one page of `stmt` ordered by `key_column`.
+
+    Only rows whose key is greater than the `after` cursor are read, so the
+    cost of a page does not grow with how far into the table it is.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    limit = clamp_page_size(limit)
+    rows = db.session.scalars(keyset_select(stmt, key_column, limit, after)).all()
+    return keyset_page(rows, key_column, limit)
@@ -0,0 +1,207 @@
+from App.database import db, begin_write
+from App.models import User, Student, Staff, LeaderBoardEntry
+from App.passwords import get_password_hasher
+from App.cache import invalidate_cache
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+from threading import Lock
+import csv, json, multiprocessing, os, time, uuid
+
+ROSTER_FIELDS = ('username', 'email', 'password')
+ROSTER_ROLES = ('student', 'staff')
+# below this many passwords in a chunk, starting worker processes costs more than it saves
+POOL_MIN_PASSWORDS = 64
+
+_pools = {}
+_pools_lock = Lock()
+
+
+def _hash_pool(processes):
+    """The process-wide pool of `processes` hashing processes, shared by every import in this process."""
+    with _pools_lock:
+        pid, pool = _pools.get(processes, (None, None))
+        if pid != os.getpid():
+            # spawned workers share nothing with the gevent hub or the open database connections
+            pool = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'))
+            _pools[processes] = (os.getpid(), pool)
+        return pool
+
+
+def _roster_rows(lines, fmt):
+    """Yield (line number, row dict, reason) from CSV or JSON-lines text, one line at a time.
+
+    `reason` is set, and the row may be None, when the line cannot be read as a row.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        if not reader.fieldnames or not set(ROSTER_FIELDS) <= {f.strip() for f in reader.fieldnames}:
+            raise ValueError("CSV must have username, email and password columns.")
+        for line_no, row in enumerate(reader, 2):
+            extra = row.pop(None, None)  # DictReader keeps fields beyond the header as a list under None
+            row = {(k or '').strip(): (v or '').strip() for k, v in row.items()}
+            yield line_no, row, 'More fields than the header' if extra is not None else None
+    elif fmt == 'json':
+        for line_no, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            if not isinstance(row, dict):
+                yield line_no, None, 'Malformed JSON object'
+                continue
+            yield line_no, {k: str(v).strip() for k, v in row.items() if v is not None}, None
+    else:
+        raise ValueError(f"Unsupported roster format {fmt!r}; use 'csv' or 'json'.")
+
+
+def _existing_users(rows):
+    """Usernames and emails among `rows` that are already registered, in one query."""
+    usernames = {row['username'] for row in rows}
+    emails = {row['email'] for row in rows}
+    taken = db.session.execute(
+        db.select(User.username, User.email).filter(User.username.in_(usernames) | User.email.in_(emails))
+    ).all()
+    return {username for username, _ in taken}, {email for _, email in taken}
+
+
+def _insert_chunk(rows, passwords):
+    """Insert one chunk of users with their student/staff rows and students' leaderboard entries."""
+    students = []
+    staff = []
+    for row, password in zip(rows, passwords):
+        user = {'username': row['username'], 'email': row['email'], 'password': password}
+        if row['role'] == 'student':
+            students.append({**user, 'totalHours': 0, 'points': 0, 'pendingHours': 0, 'accoladeCount': 0})
+        else:
+            staff.append(user)
+    if students:
+        # ORM bulk insert fills both users and student, taking the new ids from RETURNING
+        student_ids = db.session.scalars(
+            db.insert(Student).returning(Student.student_id, sort_by_parameter_order=True), students
+        ).all()
+        db.session.execute(db.insert(LeaderBoardEntry), [
+            {'entryID': str(uuid.uuid4()), 'studentID': student_id, 'rank': None, 'totalHours': 0, 'totalAccolades': 0}
+            for student_id in student_ids
+        ])
+    if staff:
+        db.session.execute(db.insert(Staff), staff)
+    return len(students), len(staff)
+
+
+def _invalid_reason(row):
+    if not all(row.get(field) for field in ROSTER_FIELDS):
+        return 'username, email and password are required'
+    if len(row['username']) > User.username.type.length:
+        return f"Username longer than {User.username.type.length} characters"
+    row['role'] = (row.get('role') or 'student').lower()
+    if row['role'] not in ROSTER_ROLES:
+        return f"Role must be one of {', '.join(ROSTER_ROLES)}"
+    return None
+
+
+def _public(row):
+    """A rejected row as reported back, without its password."""
+    return {k: v for k, v in (row or {}).items() if k != 'password'}
+
+
+def import_roster(lines, fmt='csv', chunk_size=1000, processes=None):
+    """Register students and staff from a CSV or JSON-lines roster.
+
+    Rows need username, email and password, plus an optional role
+    ('student' by default, or 'staff'). `lines` may be any iterable of
+    text lines, so an upload is read as it streams. Each chunk of rows is
+    checked for duplicates against the database with one query, its
+    passwords are hashed across `processes` worker processes (all cores by
+    default) shared by every import in this process, or on the password
+    hasher's threads for small chunks, and only then is the write
+    transaction begun: the chunk's users are written with executemany
+    inserts and committed, so the SQLite write lock is never held while
+    hashing. An interrupted import keeps the chunks already committed;
+    importing the roster again reports those rows as already registered.
+    Returns the counts created, the rejected rows with reasons and the
+    import rate.
+    """
+    started = time.perf_counter()
+    hasher = get_password_hasher()
+    processes = processes or os.cpu_count() or 1
+    hash_passwords = partial(generate_password_hash, method=hasher.method)
+
+    seen_usernames = set()
+    seen_emails = set()
+    created = {'students': 0, 'staff': 0}
+    rejected = []
+
+    def reject_taken(chunk):
+        """Drop rows whose username or email is already registered, recording them as rejected."""
+        taken_usernames, taken_emails = _existing_users([entry[1] for entry in chunk])
+        available = []
+        for line_no, row, *password in chunk:
+            if row['username'] in taken_usernames or row['email'] in taken_emails:
+                rejected.append({'line': line_no, 'row': _public(row), 'reason': 'Username or email already exists'})
+            else:
+                available.append((line_no, row, *password))
+        return available
+
+    def flush(chunk):
+        chunk = reject_taken(chunk)
+        if not chunk:
+            return
+        plain = [row['password'] for _, row in chunk]
+        if processes > 1 and len(plain) >= POOL_MIN_PASSWORDS:
+            pool = _hash_pool(processes)
+            passwords = list(pool.map(hash_passwords, plain, chunksize=max(1, len(plain) // processes)))
+        else:
+            passwords = [hasher.hash(password) for password in plain]
+        chunk = [(line_no, row, password) for (line_no, row), password in zip(chunk, passwords)]
+
+        while chunk:
+            begin_write()
+            try:
+                students, staff = _insert_chunk([row for _, row, _ in chunk], [password for _, _, password in chunk])
+                if students:
+                    invalidate_cache('students', 'leaderboard')
+                if staff:
+                    invalidate_cache('staff')
+                db.session.commit()
+            except IntegrityError:
+                # a concurrent registration took a username or email after the duplicate check
+                db.session.rollback()
+                remaining = reject_taken(chunk)
+                if len(remaining) == len(chunk):
+                    raise ValueError(f"Rows from line {chunk[0][0]} on conflict with existing data and were not imported.")
+                chunk = remaining
+                continue
+            created['students'] += students
+            created['staff'] += staff
+            return
+
+    chunk = []
+    for line_no, row, reason in _roster_rows(lines, fmt):
+        reason = reason or _invalid_reason(row)
+        if reason is None and (row['username'] in seen_usernames or row['email'] in seen_emails):
+            reason = 'Duplicate username or email in roster'
+        if reason:
+            rejected.append({'line': line_no, 'row': _public(row), 'reason': reason})
+            continue
+        seen_usernames.add(row['username'])
+        seen_emails.add(row['email'])
+        chunk.append((line_no, row))
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+
+    elapsed = time.perf_counter() - started
+    total = created['students'] + created['staff'] + len(rejected)
+    return {
+        'created': created,
+        'rejected': rejected,
+        'elapsed': elapsed,
+        'rows_per_sec': total / elapsed if elapsed else 0
+    }
+
@@ -1,16 +1,68 @@
 from functools import wraps
-from flask import session, redirect, url_for, flash, render_template
+from flask import session, redirect, url_for, flash, render_template, g, has_app_context
 from App.models import User, Student, Staff
-from App.database import db
+from App.database import db, begin_write
+from App.passwords import password_needs_rehash
+from sqlalchemy.orm import with_polymorphic
+
+
+def load_user(user_id):
+    """Load a user with its Student/Staff row in a single joined query.
+
+    A student's logged hours and requests are not loaded here: every
+    request that resolves a user would pay for the whole history. The
+    pages that list them load them on first access.
+    """
+    user_poly = with_polymorphic(User, [Student, Staff])
+    stmt = db.select(user_poly).filter(user_poly.user_id == user_id)
+    return db.session.execute(stmt).scalar_one_or_none()
+
+
+def get_request_user(user_id):
+    """Load a user by id at most once per request.
+
+    Resolved users are kept on flask.g, so the session helpers, the
+    template context processors and the JWT user loader share one lookup.
+    """
+    if user_id is None:
+        return None
+    if not has_app_context():
+        return load_user(user_id)
+    if 'request_users' not in g:
+        g.request_users = {}
+    if user_id not in g.request_users:
+        g.request_users[user_id] = load_user(user_id)
+    return g.request_users[user_id]
+
+
+def reset_request_users():
+    """Forget users resolved earlier; called at the start of each request."""
+    g.pop('request_users', None)
+
+
+def check_credentials(user, password):
+    """Verify `password` for `user`, upgrading the stored hash if the configured cost changed.
+
+    Only a successful login knows the plain password, so that is when a
+    hash made with an old method or work factor is replaced.
+    """
+    if user is None or not user.check_password(password):
+        return False
+    if password_needs_rehash(user.password):
+        begin_write()
+        user.set_password(password)
+        db.session.commit()
+    return True
 
 
 def login_user(username, password):
     """Authenticate user and store in session"""
     user = db.session.execute(db.select(User).filter_by(username=username)).scalar_one_or_none()
-    if user and user.check_password(password):
+    if check_credentials(user, password):
         session['user_id'] = user.user_id
         session['username'] = user.username
         session['role'] = user.role
+        g.setdefault('request_users', {})[user.user_id] = user
         return user
     return None
 
@@ -24,10 +76,7 @@ def logout_user():
 
 def get_current_user():
     """Get current logged in user from session"""
-    user_id = session.get('user_id')
-    if user_id:
-        return db.session.get(User, user_id)
-    return None
+    return get_request_user(session.get('user_id'))
 
 
 def login_required(f):
@@ -1,33 +1,47 @@
-from App.database import db
+from App.database import db, begin_write, replica_reads
 from App.models import User,Staff,Student,Request
+from App.controllers.ledger_controller import credit_hours, credit_hours_bulk, adjust_pending_hours, adjust_pending_hours_bulk
+from App.controllers.pagination import keyset_paginate, clamp_page_size
+from App.controllers.user import ensure_user_available, commit_new_user
+from App.cache import cached, invalidate_cache
 
 def register_staff(name,email,password): #registers a new staff member
+    begin_write()
+    ensure_user_available(name, email)
     newstaff = Staff(username=name, email=email, password=password)
     db.session.add(newstaff)
-    db.session.commit()
+    invalidate_cache('staff')
+    commit_new_user()
     return newstaff
 
+def _request_rows(stmt): #formats joined (request, student name) rows for the staff views
+    return [
+        {
+            'id': req_id,
+            'student_name': student_name if student_name else "Unknown",
+            'hours': hours,
+            'status': status,
+            'timestamp': timestamp.strftime('%Y-%m-%d %H:%M') if timestamp else None
+        }
+        for req_id, student_name, hours, status, timestamp in db.session.execute(stmt)
+    ]
+
+def _request_select(): #requests joined to the requesting student's username in one query
+    return db.select(Request.id, User.username, Request.hours, Request.status, Request.timestamp) \
+        .outerjoin(User, User.user_id == Request.student_id)
+
 def fetch_all_requests(): #fetches all pending requests for staff to review
-    pending_requests = Request.query.filter_by(status='pending').all()
-    if not pending_requests:
-        return []
-    
-    requests_data=[]
-    for req in pending_requests:
-        student = Student.query.get(req.student_id)
-        student_name = student.username if student else "Unknown"
-        
-        requests_data.append({
-            'id': req.id,
-            'student_name': student_name,
-            'hours': req.hours,
-            'status':req.status
-        })
-    
-    return requests_data
+    return _request_rows(
+        _request_select().filter(Request.status == 'pending').order_by(Request.timestamp, Request.id)
+    )
+
+def fetch_request_detail(request_id): #fetches a single request with the student's name
+    rows = _request_rows(_request_select().filter(Request.id == request_id))
+    return rows[0] if rows else None
 
 def process_request_approval(staff_id, request_id): #staff approves a student's hours request
     from App.models import LoggedHours
+    begin_write()
     staff = Staff.query.get(staff_id)
     if not staff:
         raise ValueError(f"Staff with id {staff_id} not found.")
@@ -47,6 +61,8 @@ def process_request_approval(staff_id, request_id): #staff approves a student's
     # Create a LoggedHours entry
     logged = LoggedHours(student_id=request.student_id, staff_id=staff.staff_id, hours=request.hours, status='approved')
     db.session.add(logged)
+    adjust_pending_hours(request.student_id, -request.hours)
+    credit_hours(request.student_id, request.hours)
     db.session.commit()
 
     return {
@@ -57,6 +73,7 @@ def process_request_approval(staff_id, request_id): #staff approves a student's
     }
 
 def process_request_denial(staff_id, request_id): #staff denies a student's hours request
+    begin_write()
     staff = Staff.query.get(staff_id)
     if not staff:
         raise ValueError(f"Staff with id {staff_id} not found.")
@@ -72,6 +89,7 @@ def process_request_denial(staff_id, request_id): #staff denies a student's hour
     name = student.username if student else "Unknown"
     
     request.status = 'denied'
+    adjust_pending_hours(request.student_id, -request.hours)
     db.session.commit()
     
     return {
@@ -81,28 +99,97 @@ def process_request_denial(staff_id, request_id): #staff denies a student's hour
         'denial_successful': True
     }
 
+def _load_pending_batch(staff_id, request_ids): #loads the staff member and all requested rows with one IN query
+    staff = Staff.query.get(staff_id)
+    if not staff:
+        raise ValueError(f"Staff with id {staff_id} not found.")
+
+    request_ids = list(dict.fromkeys(request_ids))
+    found = Request.query.filter(Request.id.in_(request_ids)).with_for_update().all() if request_ids else []
+    by_id = {req.id: req for req in found}
+
+    batch = []
+    for request_id in request_ids:
+        req = by_id.get(request_id)
+        if not req:
+            batch.append((request_id, None, f"Request with id {request_id} not found."))
+        elif req.status != 'pending':
+            batch.append((request_id, None, f"Request {request_id} is not pending."))
+        else:
+            batch.append((request_id, req, None))
+    return staff, batch
+
+def process_request_approvals(staff_id, request_ids): #staff approves many requests in a single transaction
+    from App.models import LoggedHours
+    from datetime import datetime
+    begin_write()
+    staff, batch = _load_pending_batch(staff_id, request_ids)
+
+    now = datetime.utcnow()
+    results = []
+    logged_rows = []
+    deltas = {}
+    for request_id, req, error in batch:
+        if error:
+            results.append({'request_id': request_id, 'status': 'error', 'message': error})
+            continue
+        req.status = 'approved'
+        logged_rows.append({'student_id': req.student_id, 'staff_id': staff.staff_id, 'hours': req.hours, 'status': 'approved', 'timestamp': now})
+        deltas[req.student_id] = deltas.get(req.student_id, 0) + req.hours
+        results.append({'request_id': request_id, 'status': 'approved', 'student_id': req.student_id, 'hours': req.hours})
+
+    if logged_rows:
+        db.session.execute(db.insert(LoggedHours), logged_rows)
+        adjust_pending_hours_bulk({student_id: -hours for student_id, hours in deltas.items()})
+        credit_hours_bulk(deltas)
+    db.session.commit()
+    return results
+
+def process_request_denials(staff_id, request_ids): #staff denies many requests in a single transaction
+    begin_write()
+    staff, batch = _load_pending_batch(staff_id, request_ids)
+
+    results = []
+    deltas = {}
+    for request_id, req, error in batch:
+        if error:
+            results.append({'request_id': request_id, 'status': 'error', 'message': error})
+            continue
+        req.status = 'denied'
+        deltas[req.student_id] = deltas.get(req.student_id, 0) - req.hours
+        results.append({'request_id': request_id, 'status': 'denied', 'student_id': req.student_id, 'hours': req.hours})
+
+    adjust_pending_hours_bulk(deltas)
+    db.session.commit()
+    return results
+
 def confirm_hours(log_id): #confirms/approves hours logged for a student
     from App.models import Activity
+    begin_write()
     activity = Activity.query.get(log_id)
     if not activity:
         raise ValueError(f"Activity with id {log_id} not found.")
     
+    already_confirmed = activity.status == "Confirmed"
     activity.status = "Confirmed"
     
     # Update student's total hours
     student = Student.query.get(activity.studentID)
-    if student:
-        student.totalHours = (student.totalHours or 0) + activity.hoursLogged
+    if student and not already_confirmed:
+        credit_hours(student.student_id, activity.hoursLogged)
     
     db.session.commit()
     return activity
 
 def reject_hours(log_id): #rejects hours logged for a student
     from App.models import Activity
+    begin_write()
     activity = Activity.query.get(log_id)
     if not activity:
         raise ValueError(f"Activity with id {log_id} not found.")
     
+    if activity.status == "Confirmed":
+        credit_hours(activity.studentID, -activity.hoursLogged)
     activity.status = "Rejected"
     db.session.commit()
     return activity
@@ -111,6 +198,7 @@ def log_hours_for_student(staff_id, student_id, hours, description=""): #staff d
     from App.models import Activity
     import uuid
     
+    begin_write()
     staff = Staff.query.get(staff_id)
     if not staff:
         raise ValueError(f"Staff with id {staff_id} not found.")
@@ -123,13 +211,118 @@ def log_hours_for_student(staff_id, student_id, hours, description=""): #staff d
     log_id = str(uuid.uuid4())
     activity = Activity(logID=log_id, studentID=student_id, hoursLogged=hours, status="Confirmed", description=description)
     
-    # Update student's total hours
-    student.totalHours = (student.totalHours or 0) + hours
-    
     db.session.add(activity)
+    # Update student's total hours
+    credit_hours(student.student_id, hours)
     db.session.commit()
     return activity
+
+def record_logged_hours(staff_id, student_id, hours): #staff records approved hours directly as a LoggedHours entry
+    from App.models import LoggedHours
+    begin_write()
+    logged = LoggedHours(student_id=student_id, staff_id=staff_id, hours=hours, status='approved')
+    db.session.add(logged)
+    credit_hours(student_id, hours)
+    db.session.commit()
+    return logged
+
+def delete_logged_hours(log_id): #removes a logged hours entry and its contribution to the leaderboard
+    from App.models import LoggedHours
+    begin_write()
+    log = LoggedHours.query.get(log_id)
+    if not log:
+        return False
+    if log.status == 'approved':
+        credit_hours(log.student_id, -log.hours)
+    db.session.delete(log)
+    db.session.commit()
+    return True
+
+def delete_request(request_id): #removes an hours request, releasing any hours still pending
+    begin_write()
+    request = Request.query.get(request_id)
+    if not request:
+        return False
+    if request.status == 'pending':
+        adjust_pending_hours(request.student_id, -request.hours)
+    db.session.delete(request)
+    db.session.commit()
+    return True
     
-def get_all_staff_json(): #returns all staff members in JSON format
-    staff_members = Staff.query.all()
-    return [staff.get_json() for staff in staff_members]
\ No newline at end of file
+def import_logged_hours_csv(staff_id, lines, chunk_size=1000): #bulk imports staff-logged hours from CSV rows
+    """Import approved LoggedHours from CSV text with student_id and hours columns.
+
+    `lines` may be any iterable of text lines (an open file or upload
+    stream). The whole stream is read and validated before the write
+    transaction begins, so a slow upload never holds the SQLite write lock;
+    only the validated rows are kept in memory. They are then inserted in
+    executemany chunks and committed once. Returns the number of rows
+    inserted, the rejected rows with reasons and the import rate.
+    """
+    import csv, math, time
+    from datetime import datetime
+    from App.models import LoggedHours
+
+    started = time.perf_counter()
+    staff = Staff.query.get(staff_id)
+    if not staff:
+        raise ValueError(f"Staff with id {staff_id} not found.")
+
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames or not {'student_id', 'hours'} <= {f.strip() for f in reader.fieldnames}:
+        raise ValueError("CSV must have student_id and hours columns.")
+
+    student_ids = set(db.session.scalars(db.select(Student.student_id)))
+    now = datetime.utcnow()
+    rows = []
+    deltas = {}
+    rejected = []
+
+    for line_no, row in enumerate(reader, 2):
+        extra = row.pop(None, None)  # DictReader keeps fields beyond the header as a list under None
+        row = {(k or '').strip(): (v or '').strip() for k, v in row.items()}
+        if extra is not None:
+            rejected.append({'line': line_no, 'row': row, 'reason': 'More fields than the header'})
+            continue
+        try:
+            student_id = int(row['student_id'])
+            hours = float(row['hours'])
+            timestamp = datetime.fromisoformat(row['timestamp']) if row.get('timestamp') else now
+        except ValueError:
+            rejected.append({'line': line_no, 'row': row, 'reason': 'Malformed student_id, hours or timestamp'})
+            continue
+        if student_id not in student_ids:
+            rejected.append({'line': line_no, 'row': row, 'reason': f"Student with id {student_id} not found"})
+            continue
+        if not math.isfinite(hours) or hours <= 0:
+            rejected.append({'line': line_no, 'row': row, 'reason': 'Hours must be a positive finite number'})
+            continue
+
+        rows.append({'student_id': student_id, 'staff_id': staff.staff_id, 'hours': hours, 'status': 'approved', 'timestamp': timestamp})
+        deltas[student_id] = deltas.get(student_id, 0) + hours
+
+    begin_write()
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(db.insert(LoggedHours), rows[start:start + chunk_size])
+    credit_hours_bulk(deltas)
+    db.session.commit()
+    inserted = len(rows)
+
+    elapsed = time.perf_counter() - started
+    return {
+        'inserted': inserted,
+        'rejected': rejected,
+        'elapsed': elapsed,
+        'rows_per_sec': (inserted + len(rejected)) / elapsed if elapsed else 0
+    }
+
+@replica_reads
+def get_all_staff_json(limit=None, after=None): #returns one keyset page of staff members in JSON format
+    limit = clamp_page_size(limit)
+    def page():
+        staff_members, next_cursor = keyset_paginate(db.select(Staff), Staff.staff_id, limit, after)
+        return {
+            'items': [staff.get_json() for staff in staff_members],
+            'next_cursor': next_cursor
+        }
+    return cached('staff', f"{limit}:{after or ''}", page)
\ No newline at end of file
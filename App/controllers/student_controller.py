@@ -1,7 +1,15 @@
-from App.database import db
-from App.models import Student, Request, Activity, Accolade, User, Staff
+from App.database import db, begin_write, replica_reads
+from App.models import Student, Request, Activity, Accolade, User, Staff, LoggedHours
 from App.controllers.activity_controller import get_student_activities
 from App.controllers.accolade_controller import get_student_accolades
+from App.controllers.leaderboard_controller import create_leaderboard_entry, get_leaderboard
+from App.controllers.ledger_controller import adjust_pending_hours
+from App.controllers.milestone_controller import milestone_names_reached, get_next_milestone, get_milestone_progress
+from App.controllers.pagination import keyset_paginate, clamp_page_size
+from App.controllers.user import ensure_user_available, commit_new_user
+from App.cache import cached, invalidate_cache
+from sqlalchemy import case, func
+from datetime import datetime
 import uuid
 
 def request_confirmation_of_hours(studentID, activityLogID):
@@ -9,108 +17,146 @@ def request_confirmation_of_hours(studentID, activityLogID):
     from App.controllers.activity_controller import update_activity_status
     return update_activity_status(activityLogID, 'Pending')
 
+# Activity statuses whose hours count towards the running total, compared case-insensitively
+CONFIRMED_STATUSES = ('confirmed', 'approved')
+
+
+def _history_cursor(date_logged, log_id):
+    return f"{date_logged.isoformat()},{log_id}"
+
+
+def _parse_history_cursor(after):
+    """Decode a (dateLogged, logID) keyset cursor."""
+    date_logged, log_id = after.split(',', 1)
+    return datetime.fromisoformat(date_logged), log_id
+
+
+def _activity_history_rows(student_id, limit=None, after=None):
+    """Run the history query for one student, oldest first.
+
+    Ordering and the running total of confirmed hours are computed in SQL
+    with SUM() OVER, so no rows are sorted or summed in Python. With an
+    `after` cursor only the rows following it are read; the running total
+    continues from a SUM over the student's rows up to the cursor, which
+    walks the (studentID, dateLogged, logID) index.
+    """
+    confirmed_hours = case((func.lower(Activity.status).in_(CONFIRMED_STATUSES), Activity.hoursLogged), else_=0)
+    running_total = func.sum(confirmed_hours).over(
+        order_by=(Activity.dateLogged, Activity.logID), rows=(None, 0)
+    )
+    stmt = db.select(Activity.logID, Activity.studentID, Activity.hoursLogged, Activity.dateLogged,
+                     Activity.status, Activity.description, running_total) \
+        .filter(Activity.studentID == student_id) \
+        .order_by(Activity.dateLogged, Activity.logID)
+
+    checkpoint = 0
+    if after:
+        date_logged, log_id = _parse_history_cursor(after)
+        stmt = stmt.filter(
+            (Activity.dateLogged > date_logged) |
+            ((Activity.dateLogged == date_logged) & (Activity.logID > log_id))
+        )
+        checkpoint = db.session.scalar(
+            db.select(func.coalesce(func.sum(confirmed_hours), 0))
+            .filter(Activity.studentID == student_id)
+            .filter((Activity.dateLogged < date_logged) |
+                    ((Activity.dateLogged == date_logged) & (Activity.logID <= log_id)))
+        )
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+
+    history = []
+    last = None
+    for log_id, student, hours, date_logged, status, description, total in db.session.execute(stmt):
+        if limit is not None and len(history) == limit:
+            return history, _history_cursor(*last)
+        cumulative = checkpoint + (total or 0)
+        timestamp = date_logged.isoformat() if date_logged else None
+        history.append({
+            'logID': log_id,
+            'studentID': student,
+            'hoursLogged': hours,
+            'dateLogged': timestamp,
+            'description': description,
+            'hours': hours or 0,
+            'timestamp': timestamp,
+            'status': (status or '').lower(),
+            'cumulative_hours': cumulative,
+            'milestones_achieved': milestone_names_reached(cumulative)
+        })
+        last = (date_logged, log_id)
+    return history, None
+
+
+@replica_reads
 def get_activity_history(student_id):
     """Fetch complete activity history for a student"""
     student = Student.query.get(student_id)
     if not student:
         raise ValueError(f"Student with id {student_id} not found.")
-    
-    # Get activities using the relationship (Activity model)
-    activities = student.activities if hasattr(student, 'activities') else Activity.query.filter_by(studentID=student_id).all()
-
-    # Build enriched activity dicts to match what the UI template expects
-    # Ensure we preserve the original to_dict() keys for backward compatibility
-    enriched = []
-
-    # Sort activities chronologically (oldest first) by dateLogged when available
-    def _activity_ts(a):
-        # prefer datetime attribute if present
-        val = getattr(a, 'dateLogged', None)
-        if val is None:
-            # fallback: try to parse from to_dict() representation
-            try:
-                d = a.to_dict()
-                return d.get('dateLogged')
-            except Exception:
-                return None
-        return val
-
-    activities_sorted = sorted(activities, key=lambda x: _activity_ts(x) or 0)
-
-    cumulative = 0
-    milestones = [10, 25, 50, 100]
-
-    for act in activities_sorted:
-        base = {}
-        try:
-            base = act.to_dict() or {}
-        except Exception:
-            base = {}
-
-        # normalize common fields
-        hours = base.get('hoursLogged') or base.get('hours') or 0
-        # date string from to_dict() is already ISO-formatted in Activity.to_dict()
-        timestamp = base.get('dateLogged') or base.get('timestamp') or None
-        status = (base.get('status') or '').lower()
-
-        # Update cumulative only for confirmed/approved entries
-        if status in ('confirmed', 'approved'):
-            try:
-                cumulative += float(hours)
-            except Exception:
-                pass
-
-        # Determine milestones achieved at this point (those crossed by cumulative now)
-        achieved = []
-        for m in milestones:
-            if cumulative >= m:
-                achieved.append(f"{m} Hours Milestone")
-
-        # Construct enriched dict, preserving original keys
-        enriched_entry = dict(base)
-        enriched_entry.update({
-            'hours': hours,
-            'timestamp': timestamp,
-            'status': status,
-            'cumulative_hours': cumulative,
-            'milestones_achieved': achieved
-        })
 
-        enriched.append(enriched_entry)
+    history, next_cursor = _activity_history_rows(student.student_id)
+    return history
+
+
+@replica_reads
+def get_activity_history_page(student_id, limit=None, after=None):
+    """Fetch one page of a student's activity history, oldest first.
+
+    Pages are keyed on (dateLogged, logID), so any page costs the same to
+    read however far into the history it is. Raises ValueError for an
+    unknown student or a malformed cursor.
+    """
+    student = Student.query.get(student_id)
+    if not student:
+        raise ValueError(f"Student with id {student_id} not found.")
 
-    return enriched
+    history, next_cursor = _activity_history_rows(student.student_id, clamp_page_size(limit), after)
+    return {
+        'items': history,
+        'next_cursor': next_cursor
+    }
 
 def register_student(name, email, password):
-    # prevent duplicate username or email
-    existing = User.query.filter((User.username == name) | (User.email == email)).first()
-    if existing:
-        raise ValueError("User with that username or email already exists")
+    begin_write()
+    ensure_user_available(name, email)
 
     newstudent = Student(username=name, email=email, password=password)
+    create_leaderboard_entry(newstudent)
     db.session.add(newstudent)
-    db.session.commit()
+    invalidate_cache('students')
+    commit_new_user()
     return newstudent
 
 def get_approved_hours(student_id):
-    """calculates and returns the total approved hours for a student"""
+    """returns the student's total approved hours (logged hours plus confirmed activities)"""
     student = Student.query.get(student_id)
     if not student:
         raise ValueError(f"Student with id {student_id} not found.")
     
-    total_hours = sum(lh.hours for lh in student.loggedhours if lh.status == 'approved')
-    return (student.username, total_hours)
+    return (student.username, student.totalHours or 0)
 
 def create_hours_request(student_id, hours):
     """creates a new hours request for a student"""
+    begin_write()
     student = Student.query.get(student_id)
     if not student:
         raise ValueError(f"Student with id {student_id} not found.")
     
     request = Request(student_id=student.student_id, hours=hours, status='pending')
     db.session.add(request)
+    adjust_pending_hours(student.student_id, hours)
     db.session.commit()
     return request
 
+def get_recent_hours(student_id, limit=5):
+    """Return the student's `limit` newest logged hours and requests as (hours, status, timestamp) rows."""
+    entries = db.union_all(
+        db.select(LoggedHours.hours, LoggedHours.status, LoggedHours.timestamp).filter(LoggedHours.student_id == student_id),
+        db.select(Request.hours, Request.status, Request.timestamp).filter(Request.student_id == student_id)
+    ).subquery()
+    return db.session.execute(db.select(entries).order_by(entries.c.timestamp.desc()).limit(limit)).all()
+
 def fetch_requests(student_id):
     """fetch requests for a student"""
     student = Student.query.get(student_id)
@@ -119,31 +165,57 @@ def fetch_requests(student_id):
     
     return student.requests
 
+@replica_reads
 def fetch_accolades(student_id):
     """fetch accolades for a student"""
-    student = Student.query.get(student_id)
-    if not student:
-        raise ValueError(f"Student with id {student_id} not found.")
-    
-    # Get actual accolades from database using relationship
-    accolades = Accolade.query.filter_by(studentID=student_id).all()
-    return [accolade.to_dict() for accolade in accolades]
-
+    def load():
+        student = Student.query.get(student_id)
+        if not student:
+            raise ValueError(f"Student with id {student_id} not found.")
+        
+        # Get actual accolades from database using relationship
+        accolades = Accolade.query.filter_by(studentID=student_id).all()
+        return [accolade.to_dict() for accolade in accolades]
+    return cached('accolades', student_id, load)
+
+@replica_reads
 def generate_leaderboard():
-    students = Student.query.all()
-    leaderboard = []
-    for student in students:
-        total_hours = sum(lh.hours for lh in student.loggedhours if lh.status == 'approved')
-
-        leaderboard.append({
-            'name': student.username,
-            'hours': total_hours
-        })
-
-    leaderboard.sort(key=lambda item: item['hours'], reverse=True)
-
-    return leaderboard
-
-def get_all_students_json():
-    students = Student.query.all()
-    return [student.get_json() for student in students]
+    return cached('leaderboard', 'all', lambda: [
+        {'name': username, 'hours': hours}
+        for rank, student_id, username, hours in get_leaderboard()
+    ])
+
+def student_summary_select(student_id):
+    """One row with a student's stored running totals."""
+    return db.select(Student.student_id, Student.username, Student.totalHours, Student.pendingHours,
+                     Student.points, Student.accoladeCount).filter(Student.student_id == student_id)
+
+def student_summary_json(row):
+    total = row.totalHours or 0
+    return {
+        'student_id': row.student_id,
+        'username': row.username,
+        'total_hours': total,
+        'pending_hours': row.pendingHours or 0,
+        'points': row.points or 0,
+        'accolades': row.accoladeCount or 0,
+        'next_milestone': get_next_milestone(total),
+        'milestone_progress': get_milestone_progress(total)
+    }
+
+@replica_reads
+def get_student_summary(student_id):
+    """Return a student's totals and milestone progress, or None if there is no such student."""
+    row = db.session.execute(student_summary_select(student_id)).first()
+    return student_summary_json(row) if row else None
+
+@replica_reads
+def get_all_students_json(limit=None, after=None):
+    limit = clamp_page_size(limit)
+    def page():
+        students, next_cursor = keyset_paginate(db.select(Student), Student.student_id, limit, after)
+        return {
+            'items': [student.get_json() for student in students],
+            'next_cursor': next_cursor
+        }
+    return cached('students', f"{limit}:{after or ''}", page)
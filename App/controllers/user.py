@@ -1,5 +1,11 @@
 from App.models import User,Request,LoggedHours
-from App.database import db
+from App.database import db, replica_reads
+from App.controllers.pagination import keyset_paginate, clamp_page_size
+from App.cache import cached, invalidate_cache
+from sqlalchemy import exists
+from sqlalchemy.exc import IntegrityError
+
+DUPLICATE_USER_MESSAGE = "User with that username or email already exists"
 
 def create_user(username, password, email):
     newuser = User(username=username, password=password, email=email)
@@ -7,6 +13,27 @@ def create_user(username, password, email):
     db.session.commit()
     return newuser
 
+def user_exists(username, email):
+    """True if any user already has `username` or `email`, checked with a single EXISTS query."""
+    return db.session.scalar(db.select(exists().where((User.username == username) | (User.email == email))))
+
+def ensure_user_available(username, email):
+    """Raise ValueError if `username` or `email` is already registered."""
+    if user_exists(username, email):
+        raise ValueError(DUPLICATE_USER_MESSAGE)
+
+def commit_new_user():
+    """Commit a registration, reporting a duplicate inserted concurrently as ValueError.
+
+    The unique indexes on username and email decide races that slip past
+    ensure_user_available between its check and this commit.
+    """
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise ValueError(DUPLICATE_USER_MESSAGE)
+
 def get_user_by_username(username):
     result = db.session.execute(db.select(User).filter_by(username=username))
     return result.scalar_one_or_none()
@@ -17,48 +44,84 @@ def get_user(id):
 def get_all_users():
     return db.session.scalars(db.select(User)).all()
 
-def get_all_users_json():
-    users = get_all_users()
-    if not users:
-        return []
-    users = [user.get_json() for user in users]
-    return users
+@replica_reads
+def get_all_users_json(limit=None, after=None):
+    users, next_cursor = keyset_paginate(db.select(User), User.user_id, limit, after)
+    return {
+        'items': [user.get_json() for user in users],
+        'next_cursor': next_cursor
+    }
 
 def update_user(id, username):
     user = get_user(id)
     if user:
         user.username = username
         # user is already in the session; no need to re-add
+        invalidate_cache('leaderboard', 'students', 'staff')
         db.session.commit()
         return True
     return None
 
-def view_leaderboard():
-    from App.models.student import Student
-    students = db.session.scalars(db.select(Student)).all()
-    leaderboard = []
-    for student in students:
-        total_hours = sum(lh.hours for lh in student.loggedhours if lh.status == 'approved')
-        leaderboard.append({
-            'student_id': student.student_id,
-            'username': student.username,
-            'total_approved_hours': total_hours
-        })
-    leaderboard.sort(key=lambda x: x['total_approved_hours'], reverse=True)
-    return leaderboard
-
-def get_all_requests_json():
-    
-    requests = Request.query.all()
-    if not requests:
-        return []
-    requests = [req.get_json() for req in requests]
-    return requests
-
-def get_all_logged_hours_json():
-    
-    logs = LoggedHours.query.all()
-    if not logs:
-        return []
-    logs = [log.get_json() for log in logs]
-    return logs
+@replica_reads
+def view_leaderboard(limit=None, after=None):
+    limit = clamp_page_size(limit)
+    return cached('leaderboard', f"page:{limit}:{after or ''}", lambda: _leaderboard_page(limit, after))
+
+def _leaderboard_page(limit, after):
+    from App.controllers.leaderboard_controller import get_leaderboard
+    rows = get_leaderboard(limit=limit + 1, after=parse_leaderboard_cursor(after))
+    return leaderboard_page_json(rows, limit)
+
+def parse_leaderboard_cursor(after):
+    """Decode a "hours:student_id" leaderboard cursor; raises ValueError on malformed input."""
+    if not after:
+        return None
+    hours, student_id = after.rsplit(':', 1)
+    return (float(hours), int(student_id))
+
+def leaderboard_page_json(rows, limit):
+    """Format up to `limit` ranked leaderboard rows (read with one extra) as a page."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1][3]}:{rows[-1][1]}"
+    return {
+        'items': [
+            {
+                'student_id': student_id,
+                'username': username,
+                'total_approved_hours': hours
+            }
+            for rank, student_id, username, hours in rows
+        ],
+        'next_cursor': next_cursor
+    }
+
+@replica_reads
+def get_all_requests_json(limit=None, after=None):
+    requests, next_cursor = keyset_paginate(db.select(Request), Request.id, limit, after)
+    return {
+        'items': [req.get_json() for req in requests],
+        'next_cursor': next_cursor
+    }
+
+@replica_reads
+def get_all_logged_hours_json(limit=None, after=None):
+    logs, next_cursor = keyset_paginate(db.select(LoggedHours), LoggedHours.id, limit, after)
+    return {
+        'items': [log.get_json() for log in logs],
+        'next_cursor': next_cursor
+    }
+
+def _iter_json(model, key_column, batch_size):
+    stmt = db.select(model).order_by(key_column).execution_options(yield_per=batch_size)
+    for obj in db.session.scalars(stmt):
+        yield obj.get_json()
+
+def iter_requests_json(batch_size=1000):
+    """Yield every request as JSON, fetching `batch_size` rows at a time."""
+    return _iter_json(Request, Request.id, batch_size)
+
+def iter_logged_hours_json(batch_size=1000):
+    """Yield every logged hours entry as JSON, fetching `batch_size` rows at a time."""
+    return _iter_json(LoggedHours, LoggedHours.id, batch_size)
@@ -1,8 +1,32 @@
+from functools import wraps
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_migrate import Migrate
+from sqlalchemy import event
 
+REPLICA_BIND = 'replica'
 
-db = SQLAlchemy()
+
+class RoutingSession(Session):
+    """Session that sends the queries of replica_reads() functions to the replica bind.
+
+    Reads stay on the primary while the session has uncommitted writes, and
+    for the rest of the session (the request) once it has committed one, so
+    a user always sees their own changes. Flushes always go to the primary.
+    Without a 'replica' bind everything uses the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and self.info.get('replica_reads') and not self._flushing
+                and not self.info.get('wrote') and not self.info.get('primary_pinned')):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                self.info['replica_used'] = True
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 def get_migrate(app):
     return Migrate(app, db)
@@ -11,4 +35,135 @@ def create_db():
     db.create_all()
     
 def init_db(app):
-    db.init_app(app)
\ No newline at end of file
+    db.init_app(app)
+    # no models map to the replica, which mirrors the primary's schema; keep create_all/drop_all off it
+    db.metadatas.pop(REPLICA_BIND, None)
+    if app.config.get('SQLITE_TUNING', True):
+        with app.app_context():
+            for engine in db.engines.values():
+                if engine.dialect.name == 'sqlite':
+                    configure_sqlite(engine, app.config)
+
+    for name, listener in (('after_flush', _mark_written),
+                           ('do_orm_execute', _mark_bulk_written),
+                           ('after_commit', _pin_primary),
+                           ('after_transaction_end', _clear_written)):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+
+def sqlite_pragmas(config):
+    """The PRAGMA statements run on every new SQLite connection."""
+    return [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+        f"PRAGMA cache_size=-{int(config.get('SQLITE_CACHE_SIZE_KB', 65536))}",
+        f"PRAGMA mmap_size={int(config.get('SQLITE_MMAP_SIZE', 268435456))}",
+    ]
+
+def configure_sqlite(engine, config):
+    """Tune SQLite for several worker processes writing the same file.
+
+    Every new connection switches to WAL (readers no longer block the
+    writer), synchronous=NORMAL, a busy_timeout so writers queue instead of
+    failing with "database is locked", and a larger page cache and mmap
+    window. Transactions are begun explicitly so begin_write() can open
+    them with BEGIN IMMEDIATE.
+    """
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        # let SQLAlchemy emit BEGIN itself instead of pysqlite's implicit deferred BEGIN
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def begin_sqlite_transaction(conn):
+        # straight to the driver so BEGIN is not counted as a query by statement listeners
+        immediate = conn.get_execution_options().get('sqlite_begin_immediate', False)
+        conn.connection.driver_connection.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        conn.info['sqlite_immediate'] = immediate
+
+def _mark_written(session, flush_context):
+    session.info['wrote'] = True
+
+def _mark_bulk_written(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+def _pin_primary(session):
+    if session.info.get('wrote'):
+        session.info['primary_pinned'] = True
+
+def _clear_written(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('wrote', None)
+
+def replica_reads(fn):
+    """Run a read-only controller's queries on the read replica when one is configured.
+
+    Instances loaded from the replica are expired afterwards, so later code
+    in the request re-reads them from the primary before changing them.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        session = db.session()
+        depth = session.info.get('replica_reads', 0)
+        session.info['replica_reads'] = depth + 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            session.info['replica_reads'] = depth
+            if not depth and session.info.pop('replica_used', False):
+                # replica rows may lag; don't let a later write in this session reuse them from the identity map
+                session.expire_all()
+    return wrapper
+
+def begin_write():
+    """Open the session's next transaction as a write transaction.
+
+    On tuned SQLite this issues BEGIN IMMEDIATE, taking the write lock up
+    front so a read-then-write transaction cannot fail half way with
+    SQLITE_BUSY; concurrent writers wait on busy_timeout instead. Call it
+    before the first query of a controller that writes. A deferred
+    transaction that has only read (such as one opened by loading an
+    expired attribute after the last commit) is rolled back first; one
+    that has already written is left as it is. Other databases begin
+    normally.
+    """
+    session = db.session()
+    if session.in_transaction():
+        connection = session.connection()
+        if (connection.dialect.name != 'sqlite' or connection.info.get('sqlite_immediate', True)
+                or session.info.get('wrote') or session.new or session.dirty or session.deleted):
+            return
+        session.rollback()
+    session.connection(execution_options={'sqlite_begin_immediate': True})
+
+def gevent_wait_callback(conn, timeout=None):
+    """Wait for psycopg2 I/O by yielding to the gevent hub instead of blocking the worker."""
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import extensions, OperationalError
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state!r}")
+
+def make_psycopg2_green():
+    """Make psycopg2 cooperative under gevent; call once per worker after fork."""
+    try:
+        from psycopg2 import extensions
+    except ImportError:
+        return False
+    extensions.set_wait_callback(gevent_wait_callback)
+    return True
@@ -11,4 +11,46 @@ JWT_TOKEN_LOCATION = ["cookies"]
 JWT_COOKIE_SECURE = True
 JWT_COOKIE_SAMESITE = "None"
 JWT_COOKIE_CSRF_PROTECT = False
-JWT_ACCESS_TOKEN_EXPIRES = 86400
\ No newline at end of file
+JWT_ACCESS_TOKEN_EXPIRES = 86400
+
+# Per-request timing and query counting (Server-Timing header and /metrics)
+INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', 'false').lower() == 'true'
+INSTRUMENTATION_MAX_QUERIES = int(os.environ.get('INSTRUMENTATION_MAX_QUERIES', 20))
+INSTRUMENTATION_SLOW_REQUEST_MS = int(os.environ.get('INSTRUMENTATION_SLOW_REQUEST_MS', 500))
+
+# Server-side result cache: 'memory' (per-process LRU), 'sqlite' (shared file) or 'none'
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 30))
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))
+CACHE_SQLITE_PATH = os.environ.get('CACHE_SQLITE_PATH', 'cache.db')
+
+# Cache-Control for ETag-validated responses, by endpoint; override the whole
+# mapping with FLASK_HTTP_CACHE_CONTROL='{"endpoint": "directives"}'
+HTTP_CACHE_CONTROL_DEFAULT = os.environ.get('HTTP_CACHE_CONTROL_DEFAULT', 'no-cache')
+HTTP_CACHE_CONTROL = {
+    'user_views.leaderboard_action': 'public, max-age=5',
+    'student_views.student_leaderboard': 'private, no-cache',
+    'staff_views.staff_leaderboard': 'private, no-cache'
+}
+
+# SQLite connection tuning (WAL, busy timeout, page cache and mmap); ignored for other databases
+SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'true').lower() == 'true'
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 65536))
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 268435456))
+
+# Password hashing: any Werkzeug method string (e.g. 'scrypt:65536:8:1', 'pbkdf2:sha256:600000').
+# Hashes made with a different method are upgraded on the user's next login.
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+
+# Read replica for leaderboard and list reads; unset sends every query to SQLALCHEMY_DATABASE_URI
+REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+
+# Background jobs: worker threads per web process (0 leaves jobs to `flask worker`),
+# how long a claimed job is leased, and retries with a doubling delay after failures
+JOBS_WORKERS = int(os.environ.get('JOBS_WORKERS', 2))
+JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL', 1.0))
+JOBS_LEASE_SECONDS = int(os.environ.get('JOBS_LEASE_SECONDS', 300))
+JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', 5))
+JOBS_RETRY_DELAY = float(os.environ.get('JOBS_RETRY_DELAY', 5))
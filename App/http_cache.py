@@ -0,0 +1,62 @@
+import hashlib
+from datetime import timezone
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+
+from App.controllers.data_version_controller import get_data_version, track_data_version
+
+
+def _cache_control(endpoint):
+    config = current_app.config
+    return config.get('HTTP_CACHE_CONTROL', {}).get(endpoint, config.get('HTTP_CACHE_CONTROL_DEFAULT', 'no-cache'))
+
+
+def _not_modified(etag, updated):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if updated is not None and request.if_modified_since is not None:
+        return request.if_modified_since >= updated.replace(microsecond=0, tzinfo=timezone.utc)
+    return False
+
+
+def conditional_get(vary_by_user=False):
+    """Serve a GET view with an ETag and Last-Modified taken from the hours data version.
+
+    A client that already holds the current version gets 304 Not Modified
+    before the view runs, so nothing is aggregated. The ETag also covers
+    the path and query string, and the session user when `vary_by_user`
+    is set for pages rendered per user. Cache-Control comes from
+    HTTP_CACHE_CONTROL by endpoint, falling back to HTTP_CACHE_CONTROL_DEFAULT.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version, updated = get_data_version()
+            key = request.full_path
+            if vary_by_user:
+                # the id from the session cookie is enough; loading the user would cost a query on every 304
+                key += f"|{session.get('user_id', '')}"
+            etag = f"{version}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+
+            if _not_modified(etag, updated):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if updated is not None:
+                response.last_modified = updated.replace(tzinfo=timezone.utc)
+            response.headers['Cache-Control'] = _cache_control(request.endpoint)
+            if vary_by_user:
+                response.vary.add('Cookie')
+            return response
+        return wrapper
+    return decorator
+
+
+def init_http_cache(app):
+    """Start tracking the data version that conditional_get responses are keyed on."""
+    track_data_version()
@@ -0,0 +1,193 @@
+import logging
+import time
+from threading import Lock
+
+from flask import g, has_request_context, request, Response
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from App.database import db
+
+logger = logging.getLogger(__name__)
+
+
+class RouteMetrics:
+    """Per-process request totals, keyed by (endpoint, method, status).
+
+    Each gunicorn worker keeps its own copy; scrape every worker or put a
+    Prometheus aggregator in front when running more than one.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._routes = {}
+        self._collectors = []
+
+    def record(self, endpoint, method, status, duration, queries, sql_time, slow):
+        key = (endpoint, method, status)
+        with self._lock:
+            stats = self._routes.setdefault(key, [0, 0.0, 0, 0.0, 0])
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] += queries
+            stats[3] += sql_time
+            stats[4] += 1 if slow else 0
+
+    def add_collector(self, collector):
+        """Register a callable returning extra Prometheus text lines for /metrics."""
+        self._collectors.append(collector)
+
+    def render(self):
+        with self._lock:
+            routes = dict(self._routes)
+        lines = []
+        series = [
+            ('app_requests_total', 'counter', 'Requests handled', 0),
+            ('app_request_duration_seconds_total', 'counter', 'Wall time spent handling requests', 1),
+            ('app_request_queries_total', 'counter', 'SQL statements executed while handling requests', 2),
+            ('app_request_sql_seconds_total', 'counter', 'Time spent executing SQL while handling requests', 3),
+            ('app_slow_requests_total', 'counter', 'Requests over the configured query or time thresholds', 4),
+        ]
+        for name, kind, help_text, index in series:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (endpoint, method, status), stats in sorted(routes.items()):
+                labels = f'endpoint="{endpoint}",method="{method}",status="{status}"'
+                lines.append(f'{name}{{{labels}}} {stats[index]}')
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection.
+
+    Selected through SQLALCHEMY_ENGINE_OPTIONS['poolclass']; the totals and
+    the current occupancy are reported on /metrics with the request metrics.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = Lock()
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def metrics_lines(self):
+        series = [
+            ('app_db_pool_checkouts_total', 'counter', 'Connections checked out of the pool', self.checkouts),
+            ('app_db_pool_checkout_wait_seconds_total', 'counter', 'Time spent waiting to check out a connection', self.wait_seconds),
+            ('app_db_pool_checkout_wait_seconds_max', 'gauge', 'Longest wait to check out a connection', self.max_wait_seconds),
+            ('app_db_pool_timeouts_total', 'counter', 'Checkouts that gave up after pool_timeout', self.timeouts),
+            ('app_db_pool_checked_out', 'gauge', 'Connections currently in use', self.checkedout()),
+            ('app_db_pool_size', 'gauge', 'Configured pool size', self.size()),
+            ('app_db_pool_overflow', 'gauge', 'Connections open beyond pool_size', max(self.overflow(), 0)),
+        ]
+        lines = []
+        for name, kind, help_text, value in series:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.append(f'{name} {value}')
+        return lines
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start_time'].pop()
+    if not has_request_context() or 'request_metrics' not in g:
+        return
+    elapsed = time.perf_counter() - started
+    metrics = g.request_metrics
+    metrics['queries'] += 1
+    metrics['sql_time'] += elapsed
+    if elapsed > metrics['slowest_time']:
+        metrics['slowest_time'] = elapsed
+        metrics['slowest_statement'] = statement
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('query_start_time'):
+        conn.info['query_start_time'].pop()
+
+
+def init_instrumentation(app):
+    """Record per-request wall time and SQL counts when INSTRUMENTATION_ENABLED is set.
+
+    Adds a Server-Timing header to every response, serves Prometheus text
+    metrics at /metrics (including pool wait and occupancy when the engine
+    uses InstrumentedQueuePool) and logs a warning for requests that run more than
+    INSTRUMENTATION_MAX_QUERIES statements or take longer than
+    INSTRUMENTATION_SLOW_REQUEST_MS.
+    """
+    if not app.config.get('INSTRUMENTATION_ENABLED'):
+        return None
+
+    metrics = RouteMetrics()
+    app.extensions['route_metrics'] = metrics
+    max_queries = app.config.get('INSTRUMENTATION_MAX_QUERIES', 20)
+    slow_ms = app.config.get('INSTRUMENTATION_SLOW_REQUEST_MS', 500)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(db.engine, 'handle_error', _handle_error)
+        engine = db.engine
+        if isinstance(engine.pool, InstrumentedQueuePool):
+            # read engine.pool on each scrape; dispose() replaces the pool object
+            metrics.add_collector(lambda: engine.pool.metrics_lines())
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_metrics = {
+            'start': time.perf_counter(),
+            'queries': 0,
+            'sql_time': 0.0,
+            'slowest_time': 0.0,
+            'slowest_statement': None
+        }
+
+    @app.after_request
+    def finish_request_metrics(response):
+        current = g.pop('request_metrics', None)
+        if current is None:
+            return response
+        duration = time.perf_counter() - current['start']
+        endpoint = request.endpoint or 'unknown'
+        slow = current['queries'] > max_queries or duration * 1000 > slow_ms
+
+        response.headers.add('Server-Timing', f"app;dur={duration * 1000:.1f}")
+        response.headers.add('Server-Timing', f"db;dur={current['sql_time'] * 1000:.1f};desc=\"{current['queries']} queries\"")
+        metrics.record(endpoint, request.method, response.status_code, duration, current['queries'], current['sql_time'], slow)
+        if slow:
+            logger.warning(
+                "Slow request %s %s: %.1f ms, %d queries, %.1f ms in SQL; slowest (%.1f ms): %s",
+                request.method, request.path, duration * 1000, current['queries'],
+                current['sql_time'] * 1000, current['slowest_time'] * 1000, current['slowest_statement']
+            )
+        return response
+
+    def metrics_endpoint():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
+    return metrics
@@ -0,0 +1,244 @@
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+
+from App.database import db, begin_write
+from App.models import Job
+
+logger = logging.getLogger(__name__)
+
+_HANDLERS = {}
+
+
+def job_handler(name):
+    """Register the decorated function as the handler for jobs called `name`.
+
+    The handler is called with the job's payload as keyword arguments inside
+    an app context and a write transaction, which is committed together with
+    the job's completion. Jobs may run more than once (after a worker dies or
+    a lease expires), so handlers must be idempotent.
+    """
+    def register(fn):
+        _HANDLERS[name] = fn
+        return fn
+    return register
+
+
+def enqueue_job(name, payload=None, delay=0, dedupe_key=None, max_attempts=None):
+    """Queue the `name` job in the caller's transaction.
+
+    The job row is only visible to workers once the caller commits, so a
+    rolled back request never leaves follow-up work behind. With a
+    `dedupe_key`, a job still waiting under that key is returned instead of
+    queueing another one. `delay` is in seconds.
+    """
+    if name not in _HANDLERS:
+        raise ValueError(f"No job handler registered for {name!r}")
+    if dedupe_key is not None:
+        queued = db.session.scalar(
+            db.select(Job).filter(Job.dedupe_key == dedupe_key, Job.status == 'queued').limit(1)
+        )
+        if queued is not None:
+            return queued
+    if max_attempts is None:
+        max_attempts = current_app.config.get('JOBS_MAX_ATTEMPTS', 5) if has_app_context() else 5
+    job = Job(name, payload, run_at=datetime.utcnow() + timedelta(seconds=delay),
+              dedupe_key=dedupe_key, max_attempts=max_attempts)
+    db.session.add(job)
+    db.session.info['jobs_enqueued'] = True
+    return job
+
+
+def get_job_runner():
+    return current_app.extensions['job_runner']
+
+
+class JobRunner:
+    """Runs queued jobs from the job table on a few threads.
+
+    Workers poll with a plain SELECT and, once a job is due, claim it in a
+    write transaction (FOR UPDATE SKIP LOCKED on Postgres, BEGIN IMMEDIATE
+    on SQLite), which leases it for `lease_seconds` by moving run_at
+    forward. A job whose worker dies is picked up again once its lease
+    runs out, so delivery is at least once.
+    A job that succeeds is deleted. A failed job is retried after
+    `retry_delay` seconds, doubling each time, until it has been attempted
+    `max_attempts` times, and is then kept as 'failed' with its traceback.
+
+    The threads are started by the first request a process serves, so
+    gunicorn workers each start their own after forking and CLI commands
+    start none; `flask worker` runs jobs in a separate process instead.
+    Under gevent they are greenlets.
+    """
+
+    def __init__(self, app, workers=2, poll_interval=1.0, lease_seconds=300, retry_delay=5, batch_size=10):
+        self.app = app
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retry_delay = retry_delay
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._pid = None
+
+    def worker_id(self):
+        return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+    def wake(self):
+        """Tell idle workers in this process to look for jobs now rather than at their next poll."""
+        self._wake.set()
+
+    def ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self.start(self.workers)
+
+    def start(self, workers):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._loop, name=f'job-worker-{n}', daemon=True)
+            for n in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        self._pid = os.getpid()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._pid = None
+
+    def run_forever(self, workers=None):
+        """Run jobs on `workers` threads until interrupted; used by `flask worker`."""
+        self.start(workers or self.workers or 1)
+        try:
+            while not self._stop.wait(1):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                ran = self.run_pending()
+            except Exception:
+                logger.exception("Job worker failed to claim jobs")
+                ran = 0
+            if not ran:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def run_pending(self, limit=None):
+        """Claim and run due jobs until none are left (or `limit` have run); returns how many ran."""
+        ran = 0
+        worker_id = self.worker_id()
+        while limit is None or ran < limit:
+            with self.app.app_context():
+                claimed = self._claim(worker_id, self.batch_size if limit is None else min(self.batch_size, limit - ran))
+                for job in claimed:
+                    self._run(job, worker_id)
+            if not claimed:
+                break
+            ran += len(claimed)
+        return ran
+
+    def _claim(self, worker_id, limit):
+        """Lease up to `limit` due jobs to `worker_id`; returns (id, name, payload, attempts, max_attempts) tuples."""
+        now = datetime.utcnow()
+        due = (Job.status.in_(('queued', 'running')), Job.run_at <= now)
+        if db.session.scalar(db.select(Job.id).filter(*due).limit(1)) is None:
+            return []
+        begin_write()
+        jobs = db.session.scalars(
+            db.select(Job).filter(*due)
+            .order_by(Job.run_at, Job.id).limit(limit).with_for_update(skip_locked=True)
+        ).all()
+        claimed = []
+        for job in jobs:
+            if job.status == 'running' and job.attempts >= job.max_attempts:
+                # its last attempt never reported back
+                job.status = 'failed'
+                job.last_error = f"Lease held by {job.locked_by} expired"
+                job.locked_by = None
+                job.finished = now
+                continue
+            job.status = 'running'
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.run_at = now + timedelta(seconds=self.lease_seconds)
+            claimed.append((job.id, job.name, dict(job.payload or {}), job.attempts, job.max_attempts))
+        db.session.commit()
+        return claimed
+
+    def _run(self, job, worker_id):
+        job_id, name, payload, attempts, max_attempts = job
+        leased = (Job.id == job_id) & (Job.locked_by == worker_id) & (Job.status == 'running')
+        try:
+            handler = _HANDLERS.get(name)
+            if handler is None:
+                raise LookupError(f"No job handler registered for {name!r}")
+            begin_write()
+            handler(**payload)
+            # finished jobs are deleted with the handler's commit; only failed ones are kept
+            db.session.execute(db.delete(Job).where(leased))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Job %s (%s) failed on attempt %s of %s", job_id, name, attempts, max_attempts)
+            now = datetime.utcnow()
+            if attempts >= max_attempts:
+                values = {'status': 'failed', 'finished': now}
+            else:
+                values = {'status': 'queued', 'run_at': now + timedelta(seconds=self.retry_delay * 2 ** (attempts - 1))}
+            begin_write()
+            db.session.execute(db.update(Job).where(leased).values(
+                locked_by=None, last_error=traceback.format_exc(limit=5), **values
+            ))
+            db.session.commit()
+
+
+def _wake_runner(session):
+    if session.info.pop('jobs_enqueued', False) and has_app_context():
+        runner = current_app.extensions.get('job_runner')
+        if runner is not None:
+            runner.wake()
+
+
+def _discard_enqueued(session):
+    session.info.pop('jobs_enqueued', None)
+
+
+def init_jobs(app):
+    """Create the app's JobRunner from the JOBS_* settings.
+
+    With JOBS_WORKERS above zero, worker threads start with the first
+    request; with 0, jobs wait in the table for `flask worker`.
+    """
+    runner = JobRunner(app,
+                       workers=app.config.get('JOBS_WORKERS', 2),
+                       poll_interval=app.config.get('JOBS_POLL_INTERVAL', 1.0),
+                       lease_seconds=app.config.get('JOBS_LEASE_SECONDS', 300),
+                       retry_delay=app.config.get('JOBS_RETRY_DELAY', 5))
+    app.extensions['job_runner'] = runner
+    if runner.workers:
+        app.before_request(runner.ensure_started)
+    for name, listener in (('after_commit', _wake_runner), ('after_rollback', _discard_enqueued)):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+    return runner
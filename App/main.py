@@ -1,22 +1,31 @@
 import os
 from flask import Flask, render_template, session
-from flask_uploads import DOCUMENTS, IMAGES, TEXT, UploadSet, configure_uploads
+from flask_uploads import DATA, DOCUMENTS, IMAGES, TEXT, UploadSet, configure_uploads
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from werkzeug.datastructures import FileStorage
 
 from App.database import init_db, db
 from App.config import load_config
+from App.instrumentation import init_instrumentation
+from App.http_cache import init_http_cache
+from App.cache import init_cache
+from App.passwords import init_password_hasher
+from App.jobs import init_jobs
 
 
 from App.controllers import (
     setup_jwt,
     add_auth_context
 )
+from App.controllers.session_auth import get_current_user, reset_request_users
 
 from App.views import views, setup_admin
 from App.models import User
 
+# Shared upload set; also used by the staff CSV hours import
+photos = UploadSet('photos', TEXT + DOCUMENTS + IMAGES + DATA)
+
 
 def add_views(app):
     for view in views:
@@ -24,11 +33,12 @@ def add_views(app):
 
 
 def add_session_context(app):
+    app.before_request(reset_request_users)
+
     @app.context_processor
     def inject_session_user():
-        user_id = session.get('user_id')
-        if user_id:
-            current_user = db.session.get(User, user_id)
+        current_user = get_current_user()
+        if current_user is not None:
             return dict(is_authenticated=True, current_user=current_user)
         return dict(is_authenticated=False, current_user=None)
 
@@ -44,10 +54,14 @@ def create_app(overrides={}):
     CORS(app, supports_credentials=True)
     add_auth_context(app)
     add_session_context(app)
-    photos = UploadSet('photos', TEXT + DOCUMENTS + IMAGES)
     configure_uploads(app, photos)
     add_views(app)
     init_db(app)
+    init_instrumentation(app)
+    init_http_cache(app)
+    init_cache(app)
+    init_password_hasher(app)
+    init_jobs(app)
     jwt = setup_jwt(app)
     setup_admin(app)
     @jwt.invalid_token_loader
@@ -4,4 +4,7 @@ from .staff import Staff
 from .request import Request
 from .loggedhours import LoggedHours
 from .activity import Activity
-from .accolade import Accolade
\ No newline at end of file
+from .accolade import Accolade
+from .leaderBoardEntry import LeaderBoardEntry
+from .dataVersion import DataVersion
+from .job import Job
\ No newline at end of file
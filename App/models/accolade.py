@@ -11,6 +11,11 @@ class Accolade(db.Model):
     milestoneHours = db.Column(db.Integer)
     dateAwarded = db.Column(db.DateTime)
 
+    __table_args__ = (
+        db.Index('ix_accolade_student', 'studentID'),
+        db.UniqueConstraint('studentID', 'milestoneHours', name='uq_accolade_student_milestone'),
+    )
+
     def __init__(self, accoladeID, studentID, name, milestoneHours, dateAwarded=None):
         self.accoladeID = accoladeID
         self.studentID = studentID
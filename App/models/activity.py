@@ -9,6 +9,12 @@ class Activity(db.Model):
     status = db.Column(db.String)  # (Logged, Pending, Confirmed, Rejected)
     description = db.Column(db.String)
 
+    __table_args__ = (
+        db.Index('ix_activity_student_status', 'studentID', 'status'),
+        db.Index('ix_activity_status_date', 'status', 'dateLogged'),
+        db.Index('ix_activity_student_date', 'studentID', 'dateLogged', 'logID'),
+    )
+
     def __init__(self, logID, studentID, hoursLogged, dateLogged=None, status='Pending', description=''):
         self.logID = logID
         self.studentID = studentID
@@ -0,0 +1,21 @@
+from App.database import db
+from datetime import datetime
+
+class DataVersion(db.Model):
+    __tablename__ = 'data_version'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __init__(self, name, version=0, updated=None):
+        self.name = name
+        self.version = version
+        self.updated = updated if updated else datetime.utcnow()
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'updated': self.updated.isoformat() if self.updated else None
+        }
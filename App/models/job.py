@@ -0,0 +1,48 @@
+from App.database import db
+from datetime import datetime
+
+class Job(db.Model):
+    __tablename__ = 'job'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    dedupe_key = db.Column(db.String(200))
+    status = db.Column(db.String(20), nullable=False, default='queued')  # (queued, running, failed); finished jobs are deleted
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    # when a queued job becomes due, or when a running job's lease expires
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(200))
+    last_error = db.Column(db.Text)
+    created = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_job_status_run_at', 'status', 'run_at'),
+        db.Index('ix_job_dedupe_key', 'dedupe_key'),
+    )
+
+    def __init__(self, name, payload=None, run_at=None, dedupe_key=None, max_attempts=5):
+        self.name = name
+        self.payload = payload if payload is not None else {}
+        self.run_at = run_at if run_at else datetime.utcnow()
+        self.dedupe_key = dedupe_key
+        self.status = 'queued'
+        self.attempts = 0
+        self.max_attempts = max_attempts
+        self.created = datetime.utcnow()
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'payload': self.payload,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_at': self.run_at.isoformat() if self.run_at else None,
+            'last_error': self.last_error,
+            'created': self.created.isoformat() if self.created else None,
+            'finished': self.finished.isoformat() if self.finished else None
+        }
@@ -5,10 +5,10 @@ class LeaderBoardEntry(db.Model):
     __tablename__ = 'leaderBoardEntry'
 
     entryID = db.Column(db.String, primary_key=True)
-    studentID = db.Column(db.Integer, db.ForeignKey('student.student_id'))
+    studentID = db.Column(db.Integer, db.ForeignKey('student.student_id'), unique=True)
     rank = db.Column(db.Integer)
-    totalHours = db.Column(db.Integer)
-    totalAccolades = db.Column(db.Integer)
+    totalHours = db.Column(db.Float, nullable=False, default=0)
+    totalAccolades = db.Column(db.Integer, default=0)
 
     def __init__(self, studentID, rank, totalHours, totalAccolades):
         self.entryID = str(uuid.uuid4())
@@ -38,4 +38,8 @@ class LeaderBoardEntry(db.Model):
             self.totalAccolades = 0
     
     def getRank(self):
-        return self.rank
\ No newline at end of file
+        return self.rank
+
+
+# Leaderboard reads walk this index in order instead of aggregating hours
+db.Index('ix_leaderboard_total_hours', LeaderBoardEntry.totalHours.desc(), LeaderBoardEntry.studentID)
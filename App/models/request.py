@@ -8,6 +8,11 @@ class Request(db.Model):
     status = db.Column(db.String(20), nullable=False, default='pending')
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_request_status_timestamp', 'status', 'timestamp'),
+        db.Index('ix_request_student_status', 'student_id', 'status'),
+    )
+
     def __init__(self, student_id, hours, status='pending', timestamp=None):
         self.student_id = student_id
         self.hours = hours
@@ -8,8 +8,10 @@ class Student(User):
     student_id = db.Column(db.Integer,
                            db.ForeignKey("users.user_id"),
                            primary_key=True)
-    totalHours = db.Column(db.Integer, default=0)
+    totalHours = db.Column(db.Float, default=0)
     points = db.Column(db.Integer, default=0)
+    pendingHours = db.Column(db.Float, default=0)
+    accoladeCount = db.Column(db.Integer, default=0)
 
     loggedhours = db.relationship('LoggedHours',
                                   backref='student',
@@ -19,6 +21,11 @@ class Student(User):
                                backref='student',
                                lazy=True,
                                cascade="all, delete-orphan")
+    leaderboard_entry = db.relationship('LeaderBoardEntry',
+                                        backref='student',
+                                        uselist=False,
+                                        lazy=True,
+                                        cascade="all, delete-orphan")
 
     __mapper_args__ = {"polymorphic_identity": "student"}
 
@@ -26,6 +33,8 @@ class Student(User):
         super().__init__(username, email, password, role="student")
         self.totalHours = 0
         self.points = 0
+        self.pendingHours = 0
+        self.accoladeCount = 0
 
     @property
     def studentID(self):
@@ -1,4 +1,4 @@
-from werkzeug.security import check_password_hash, generate_password_hash
+from App.passwords import hash_password, verify_password
 from App.database import db
 
 class User(db.Model):
@@ -6,7 +6,7 @@ class User(db.Model):
     user_id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(20), nullable=False, unique=True)
     password = db.Column(db.String(256), nullable=False)
-    email = db.Column(db.String(256), nullable=False)
+    email = db.Column(db.String(256), nullable=False, unique=True, index=True)
     role = db.Column(db.String(256), nullable=False, default="user")
 
     __mapper_args__ = {
@@ -29,9 +29,9 @@ class User(db.Model):
 
     def set_password(self, password):
         """Create hashed password."""
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
 
     def check_password(self, password):
         """Check hashed password."""
-        return check_password_hash(self.password, password)
+        return verify_password(self.password, password)
 
@@ -0,0 +1,112 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'scrypt'
+
+
+def _gevent_patched():
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded pool of native threads.
+
+    scrypt and pbkdf2 release the GIL, so running them off the request
+    greenlet keeps a burst of logins from stalling every other request in
+    a gevent worker, and `workers` caps how many cores hashing can take.
+    Under gevent the pool is gevent's own native threadpool (monkey-patched
+    threads would just be greenlets); otherwise it is a ThreadPoolExecutor.
+    The pool is created lazily and again after a fork. With `workers=0`
+    hashing runs inline.
+    """
+
+    def __init__(self, method=DEFAULT_METHOD, workers=4):
+        self.method = method
+        self.workers = workers
+        self._lock = Lock()
+        self._pool = None
+        self._pool_pid = None
+        self._prefix = None
+
+    def _submit(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                if _gevent_patched():
+                    from gevent.threadpool import ThreadPool
+                    self._pool = ThreadPool(self.workers)
+                else:
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hash')
+                self._pool_pid = os.getpid()
+            pool = self._pool
+        if isinstance(pool, ThreadPoolExecutor):
+            return pool.submit(fn, *args).result()
+        return pool.apply(fn, args)
+
+    def hash(self, password):
+        return self._submit(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._submit(check_password_hash, pwhash, password)
+
+    def method_prefix(self):
+        """The method and cost parameters this hasher writes, e.g. 'scrypt:32768:8:1'."""
+        if self._prefix is None:
+            # Werkzeug fills in default parameters for short names like 'scrypt'
+            self._prefix = self.hash('').split('$', 1)[0]
+        return self._prefix
+
+    def needs_rehash(self, pwhash):
+        """True if `pwhash` was made with a different method or work factor than configured."""
+        return pwhash.split('$', 1)[0] != self.method_prefix()
+
+    def shutdown(self):
+        with self._lock:
+            if isinstance(self._pool, ThreadPoolExecutor):
+                self._pool.shutdown(wait=False)
+            elif self._pool is not None:
+                self._pool.kill()
+            self._pool = None
+
+
+_inline_hasher = PasswordHasher(workers=0)
+
+
+def get_password_hasher():
+    """Return the current app's password hasher, or an inline default outside an app."""
+    if has_app_context():
+        return current_app.extensions.get('password_hasher', _inline_hasher)
+    return _inline_hasher
+
+
+def hash_password(password):
+    return get_password_hasher().hash(password)
+
+
+def verify_password(pwhash, password):
+    return get_password_hasher().verify(pwhash, password)
+
+
+def password_needs_rehash(pwhash):
+    return get_password_hasher().needs_rehash(pwhash)
+
+
+def init_password_hasher(app):
+    """Create the password hasher from PASSWORD_HASH_METHOD and PASSWORD_HASH_WORKERS.
+
+    PASSWORD_HASH_METHOD is any Werkzeug method string, e.g. 'scrypt',
+    'scrypt:65536:8:1' or 'pbkdf2:sha256:600000'.
+    """
+    hasher = PasswordHasher(app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+                            app.config.get('PASSWORD_HASH_WORKERS', 4))
+    app.extensions['password_hasher'] = hasher
+    return hasher
@@ -1,7 +1,15 @@
 
 async function getUserData(){
-    const response = await fetch('/api/users');
-    return response.json();
+    let users = [];
+    let cursor = null;
+    do {
+        const query = cursor ? `?after=${encodeURIComponent(cursor)}` : '';
+        const response = await fetch(`/api/users${query}`);
+        const page = await response.json();
+        users = users.concat(page.items);
+        cursor = page.next_cursor;
+    } while (cursor);
+    return users;
 }
 
 function loadTable(users){
@@ -1,10 +1,10 @@
-import os, tempfile, pytest, logging, unittest
+import os, tempfile, pytest, logging, unittest, importlib.util, json
 from werkzeug.security import check_password_hash, generate_password_hash
 from datetime import datetime
 
 from App.main import create_app
 from App.database import db, create_db
-from App.models import User, Student, Request, Staff, LoggedHours, Accolade, Activity
+from App.models import User, Student, Request, Staff, LoggedHours, Accolade, Activity, LeaderBoardEntry
 from App.controllers import (
     create_user,
     get_all_users_json,
@@ -21,6 +21,7 @@ from App.controllers.student_controller import (
     fetch_accolades,
     generate_leaderboard,
     get_activity_history,
+    get_activity_history_page,
     request_confirmation_of_hours
 )
 from App.controllers.staff_controller import (
@@ -28,9 +29,13 @@ from App.controllers.staff_controller import (
     fetch_all_requests,
     process_request_approval,
     process_request_denial,
+    process_request_approvals,
+    process_request_denials,
     confirm_hours,
     reject_hours,
-    log_hours_for_student
+    log_hours_for_student,
+    record_logged_hours,
+    delete_logged_hours
 )
 from App.controllers.accolade_controller import (
     create_accolade,
@@ -42,6 +47,26 @@ from App.controllers.activity_controller import (
     update_activity_status,
     get_student_activities
 )
+from App.controllers.hours_controller import (
+    get_approved_hours_totals
+)
+from App.controllers.leaderboard_controller import (
+    get_leaderboard,
+    rebuild_leaderboard
+)
+from App.controllers.ledger_controller import (
+    AWARD_MILESTONES_JOB,
+    credit_hours,
+    award_reached_milestones,
+    recompute_student_totals
+)
+from App.controllers.milestone_controller import (
+    crossed_milestones,
+    get_next_milestone,
+    get_milestone_progress
+)
+
+from App.jobs import get_job_runner, enqueue_job
 
 LOGGER = logging.getLogger(__name__)
 
@@ -239,13 +264,20 @@ class ActivityUnitTests(unittest.TestCase):
 # This fixture creates an empty database for the test and deletes it after the test
 @pytest.fixture(autouse=True, scope="function")
 def empty_db():
-    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db', 'JOBS_WORKERS': 0})
     with app.app_context():
         create_db()
         yield app.test_client()
         db.session.remove()
         db.drop_all()
 
+def create_test_app(overrides):
+    """Build a second app against the test database without leaving its context pushed."""
+    from flask.globals import app_ctx
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db', 'JOBS_WORKERS': 0, **overrides})
+    app_ctx._get_current_object().pop()
+    return app
+
 class StaffIntegrationTests(unittest.TestCase):
     
     def test_register_staff(self):
@@ -274,6 +306,24 @@ class StaffIntegrationTests(unittest.TestCase):
         except Exception as e:
             # This is expected
             pass
+
+    def test_registration_race_reported_as_duplicate(self):
+        from App.controllers.user import commit_new_user
+        register_staff("racer1", "race@example.com", "pass")
+        # a row that got past the EXISTS check before a concurrent registration committed
+        db.session.add(Staff(username="racer2", email="race@example.com", password="pass"))
+        with self.assertRaises(ValueError):
+            commit_new_user()
+        self.assertEqual(Staff.query.filter_by(email="race@example.com").count(), 1)
+
+    def test_create_endpoints_reject_duplicates(self):
+        client = create_test_app({}).test_client()
+        response = client.post('/api/create_Staff', json={'name': "endpointstaff", 'email': "endpoint@example.com", 'password': "pass"})
+        self.assertEqual(response.status_code, 200)
+        response = client.post('/api/create_Student', json={'name': "endpointstudent", 'email': "endpoint@example.com", 'password': "pass"})
+        self.assertEqual(response.status_code, 400)
+        response = client.post('/api/create_Staff', json={'name': "endpointstaff", 'email': "other@example.com", 'password': "pass"})
+        self.assertEqual(response.status_code, 400)
     
     def test_fetch_all_requests_empty(self):
         # Test when no pending requests exist
@@ -291,6 +341,26 @@ class StaffIntegrationTests(unittest.TestCase):
         self.assertTrue(len(requests) > 0)
         self.assertEqual(requests[0]['hours'], 3.5)
     
+    def test_fetch_all_requests_single_query(self):
+        from sqlalchemy import event
+        students = [register_student(f"queue{i}", f"queue{i}@example.com", "pass") for i in range(3)]
+        for student in students:
+            create_hours_request(student.user_id, 2.0)
+        db.session.expire_all()
+
+        statements = []
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", count)
+        try:
+            requests = fetch_all_requests()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count)
+
+        self.assertEqual(len(statements), 1)
+        self.assertEqual([r['student_name'] for r in requests], ["queue0", "queue1", "queue2"])
+        self.assertIsNotNone(requests[0]['timestamp'])
+    
     def test_process_request_approval(self):
         # Prepare staff, student and request
         staff = register_staff("carmichael", "carm@example.com", "staffpass")
@@ -351,6 +421,90 @@ class StaffIntegrationTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             process_request_denial(99999, req.id)
     
+    def test_process_request_approvals_batch(self):
+        staff = register_staff("batchstaff", "batchstaff@example.com", "pass")
+        student1 = register_student("batchstud1", "batchstud1@example.com", "pass")
+        student2 = register_student("batchstud2", "batchstud2@example.com", "pass")
+        r1 = create_hours_request(student1.user_id, 2.0)
+        r2 = create_hours_request(student1.user_id, 3.0)
+        r3 = create_hours_request(student2.user_id, 4.0)
+        r4 = create_hours_request(student2.user_id, 1.0)
+        process_request_denial(staff.user_id, r4.id)
+
+        results = process_request_approvals(staff.user_id, [r1.id, r2.id, r3.id, r4.id, 99999])
+        self.assertEqual([r['status'] for r in results], ['approved', 'approved', 'approved', 'error', 'error'])
+        self.assertEqual(LoggedHours.query.count(), 3)
+        self.assertEqual(Request.query.get(r3.id).status, 'approved')
+        self.assertEqual(generate_leaderboard(), [
+            {'name': "batchstud1", 'hours': 5.0},
+            {'name': "batchstud2", 'hours': 4.0}
+        ])
+
+    def test_process_request_denials_batch(self):
+        staff = register_staff("denystaff", "denystaff@example.com", "pass")
+        student = register_student("denystud", "denystud@example.com", "pass")
+        r1 = create_hours_request(student.user_id, 2.0)
+        r2 = create_hours_request(student.user_id, 3.0)
+
+        results = process_request_denials(staff.user_id, [r1.id, r2.id])
+        self.assertEqual([r['status'] for r in results], ['denied', 'denied'])
+        self.assertEqual(LoggedHours.query.count(), 0)
+        with self.assertRaises(ValueError):
+            process_request_denials(99999, [r1.id])
+
+    def test_import_logged_hours_csv(self):
+        from App.controllers.staff_controller import import_logged_hours_csv
+        staff = register_staff("importstaff", "importstaff@example.com", "pass")
+        student = register_student("importstud", "importstud@example.com", "pass")
+        lines = [
+            "student_id,hours,timestamp\n",
+            f"{student.user_id},2.5,2024-01-05T10:00:00\n",
+            f"{student.user_id},1.5,\n",
+            "99999,3,\n",
+            f"{student.user_id},abc,\n",
+            f"{student.user_id},2,,extra\n",
+            f"{student.user_id},nan,\n",
+            f"{student.user_id},inf,\n",
+        ]
+
+        report = import_logged_hours_csv(staff.user_id, lines, chunk_size=1)
+        self.assertEqual(report['inserted'], 2)
+        self.assertEqual([(r['line'], r['reason']) for r in report['rejected'][2:]],
+                         [(6, 'More fields than the header'), (7, 'Hours must be a positive finite number'), (8, 'Hours must be a positive finite number')])
+        self.assertEqual([r['line'] for r in report['rejected']], [4, 5, 6, 7, 8])
+        self.assertEqual(get_approved_hours(student.user_id)[1], 4.0)
+        self.assertEqual(generate_leaderboard(), [{'name': "importstud", 'hours': 4.0}])
+
+    def test_import_logged_hours_csv_reads_upload_before_locking(self):
+        import sqlite3
+        from App.controllers.staff_controller import import_logged_hours_csv
+        staff = register_staff("importstaff3", "importstaff3@example.com", "pass")
+        student = register_student("importstud3", "importstud3@example.com", "pass")
+        path = db.engine.url.database
+        locked = []
+
+        def upload():
+            yield "student_id,hours\n"
+            # another writer arriving mid-upload must not find the write lock taken
+            other = sqlite3.connect(path, timeout=0, isolation_level=None)
+            try:
+                other.execute("BEGIN IMMEDIATE")
+                other.execute("ROLLBACK")
+            except sqlite3.OperationalError:
+                locked.append(True)
+            finally:
+                other.close()
+            yield f"{student.user_id},2\n"
+
+        self.assertEqual(import_logged_hours_csv(staff.user_id, upload())['inserted'], 1)
+        self.assertEqual(locked, [])
+
+    def test_import_logged_hours_csv_missing_columns(self):
+        from App.controllers.staff_controller import import_logged_hours_csv
+        staff = register_staff("importstaff2", "importstaff2@example.com", "pass")
+        with self.assertRaises(ValueError):
+            import_logged_hours_csv(staff.user_id, ["name,hours\n", "bob,2\n"])
+
     def test_confirm_hours(self):
         # Create activity and confirm it
         student = register_student("teststudent", "test@example.com", "pass")
@@ -486,6 +640,28 @@ class StudentIntegrationTests(unittest.TestCase):
         history = get_activity_history(student.user_id)
         self.assertTrue(len(history) >= 2)
     
+    def test_activity_history_cumulative_and_pages(self):
+        student = register_student("historypages", "historypages@example.com", "pass")
+        for day, (hours, status) in enumerate([(4, 'Confirmed'), (2, 'Pending'), (7, 'Confirmed'), (20, 'Confirmed'), (1, 'Rejected'), (3, 'approved')], 1):
+            db.session.add(Activity(logID=f"hist-{day}", studentID=student.user_id, hoursLogged=hours,
+                                    dateLogged=datetime(2024, 1, day), status=status))
+        db.session.commit()
+
+        history = get_activity_history(student.user_id)
+        self.assertEqual([entry['cumulative_hours'] for entry in history], [4, 4, 11, 31, 31, 34])
+        self.assertEqual(list(history[3]['milestones_achieved']), ["10 Hours Milestone", "25 Hours Milestone"])
+
+        pages, after = [], None
+        while True:
+            page = get_activity_history_page(student.user_id, limit=2, after=after)
+            pages.extend(page['items'])
+            after = page['next_cursor']
+            if after is None:
+                break
+        self.assertEqual(pages, history)
+        with self.assertRaises(ValueError):
+            get_activity_history_page(student.user_id, after="not-a-cursor")
+
     def test_request_confirmation_of_hours(self):
         student = register_student("confirmstudent", "confirm@example.com", "pass")
         activity = create_activity_log(student.user_id, 3, "Activity to confirm")
@@ -523,6 +699,18 @@ class AccoladeIntegrationTests(unittest.TestCase):
         # Try to award non-existent accolade
         result = award_accolade(student.user_id, "NONEXISTENT")
         self.assertIsNone(result)
+
+    def test_award_accolade_milestone_already_held(self):
+        staff = register_staff("heldstaff", "heldstaff@example.com", "pass")
+        student = register_student("heldstudent", "held@example.com", "pass")
+        accolade = create_accolade("10 Hours Milestone", 10)
+        record_logged_hours(staff.user_id, student.user_id, 12)
+        get_job_runner().run_pending()
+        db.session.rollback()
+
+        self.assertIsNone(award_accolade(student.user_id, accolade.accoladeID))
+        self.assertIsNone(db.session.get(Accolade, accolade.accoladeID).studentID)
+        self.assertEqual(db.session.get(Student, student.user_id).accoladeCount, 1)
     
     def test_get_student_accolades(self):
         student = register_student("multiaccolade", "multi@example.com", "pass")
@@ -582,6 +770,908 @@ class ActivityIntegrationTests(unittest.TestCase):
         # Activity should be in Pending status by default
         self.assertEqual(activity.status, "Pending")
 
+class HoursIntegrationTests(unittest.TestCase):
+
+    def test_get_approved_hours_controller(self):
+        student = register_student("hoursstudent", "hours@example.com", "pass")
+        db.session.add_all([
+            LoggedHours(student_id=student.user_id, staff_id=None, hours=6.0, status='approved'),
+            LoggedHours(student_id=student.user_id, staff_id=None, hours=2.5, status='approved'),
+            LoggedHours(student_id=student.user_id, staff_id=None, hours=9.0, status='pending')
+        ])
+        db.session.add(Activity(logID="HOURSACT1", studentID=student.user_id, hoursLogged=2, status='Confirmed'))
+        db.session.commit()
+        # rows written around the ledger only count once the totals are recomputed
+        recompute_student_totals()
+
+        self.assertEqual(get_approved_hours(student.user_id), ("hoursstudent", 10.5))
+
+    def test_get_approved_hours_totals_batch(self):
+        student1 = register_student("batchone", "batchone@example.com", "pass")
+        student2 = register_student("batchtwo", "batchtwo@example.com", "pass")
+        student3 = register_student("batchthree", "batchthree@example.com", "pass")
+        db.session.add_all([
+            LoggedHours(student_id=student1.user_id, staff_id=None, hours=1.0, status='approved'),
+            LoggedHours(student_id=student1.user_id, staff_id=None, hours=2.0, status='approved'),
+            LoggedHours(student_id=student2.user_id, staff_id=None, hours=4.0, status='approved')
+        ])
+        db.session.commit()
+
+        totals = get_approved_hours_totals([student1.user_id, student2.user_id, student3.user_id])
+        self.assertEqual(totals, {student1.user_id: 3.0, student2.user_id: 4.0})
+
+class LeaderboardIntegrationTests(unittest.TestCase):
+
+    def test_leaderboard_updated_on_approval(self):
+        staff = register_staff("lbstaff", "lbstaff@example.com", "pass")
+        student1 = register_student("lbfirst", "lbfirst@example.com", "pass")
+        student2 = register_student("lbsecond", "lbsecond@example.com", "pass")
+
+        req1 = create_hours_request(student1.user_id, 2.0)
+        req2 = create_hours_request(student2.user_id, 7.5)
+        process_request_approval(staff.user_id, req1.id)
+        process_request_approval(staff.user_id, req2.id)
+
+        leaderboard = generate_leaderboard()
+        self.assertEqual(leaderboard[0], {'name': "lbsecond", 'hours': 7.5})
+        self.assertEqual(leaderboard[1], {'name': "lbfirst", 'hours': 2.0})
+
+    def test_leaderboard_updated_on_staff_logged_hours(self):
+        staff = register_staff("lbstaff2", "lbstaff2@example.com", "pass")
+        student = register_student("lbstudent", "lbstudent@example.com", "pass")
+
+        log_hours_for_student(staff.user_id, student.user_id, 4, "Logged by staff")
+        activity = create_activity_log(student.user_id, 3, "Needs confirmation")
+        confirm_hours(activity.logID)
+        confirm_hours(activity.logID)
+
+        entry = LeaderBoardEntry.query.filter_by(studentID=student.user_id).first()
+        self.assertEqual(entry.totalHours, 7)
+
+    def test_leaderboard_matches_rebuild(self):
+        staff = register_staff("lbstaff3", "lbstaff3@example.com", "pass")
+        student = register_student("lbrebuild", "lbrebuild@example.com", "pass")
+        req = create_hours_request(student.user_id, 5.0)
+        process_request_approval(staff.user_id, req.id)
+        log = LoggedHours(student_id=student.user_id, staff_id=staff.user_id, hours=3.0, status='pending')
+        db.session.add(log)
+        db.session.commit()
+
+        before = get_leaderboard()
+        rebuild_leaderboard()
+        self.assertEqual(get_leaderboard(), before)
+        self.assertEqual(before[0][3], 5.0)
+
+    def test_delete_logs_updates_leaderboard(self):
+        from App.controllers.staff_controller import delete_logged_hours
+        staff = register_staff("lbstaff4", "lbstaff4@example.com", "pass")
+        student = register_student("lbdelete", "lbdelete@example.com", "pass")
+        req = create_hours_request(student.user_id, 6.0)
+        result = process_request_approval(staff.user_id, req.id)
+
+        self.assertTrue(delete_logged_hours(result['logged_hours'].id))
+        self.assertEqual(generate_leaderboard(), [{'name': "lbdelete", 'hours': 0}])
+        self.assertFalse(delete_logged_hours(result['logged_hours'].id))
+
+class LedgerIntegrationTests(unittest.TestCase):
+
+    def test_totals_follow_request_lifecycle(self):
+        staff = register_staff("ledgerstaff", "ledgerstaff@example.com", "pass")
+        student = register_student("ledgerstud", "ledgerstud@example.com", "pass")
+        req1 = create_hours_request(student.user_id, 4.5)
+        req2 = create_hours_request(student.user_id, 2.0)
+        req3 = create_hours_request(student.user_id, 1.0)
+        self.assertEqual(db.session.get(Student, student.user_id).pendingHours, 7.5)
+
+        process_request_approval(staff.user_id, req1.id)
+        process_request_denials(staff.user_id, [req2.id])
+        process_request_approvals(staff.user_id, [req3.id])
+
+        student = db.session.get(Student, student.user_id)
+        self.assertEqual(student.pendingHours, 0)
+        self.assertEqual(student.totalHours, 5.5)
+        self.assertEqual(student.points, 55)
+
+    def test_activity_and_accolade_counters(self):
+        staff = register_staff("ledgerstaff2", "ledgerstaff2@example.com", "pass")
+        student = register_student("ledgerstud2", "ledgerstud2@example.com", "pass")
+        log_hours_for_student(staff.user_id, student.user_id, 3, "Logged by staff")
+        activity = create_activity_log(student.user_id, 2, "Pending confirmation")
+        confirm_hours(activity.logID)
+        reject_hours(activity.logID)
+        accolade = create_accolade("Ledger Accolade", 10)
+        award_accolade(student.user_id, accolade.accoladeID)
+        award_accolade(student.user_id, accolade.accoladeID)
+
+        student = db.session.get(Student, student.user_id)
+        self.assertEqual(student.totalHours, 3)
+        self.assertEqual(student.accoladeCount, 1)
+        self.assertEqual(LeaderBoardEntry.query.filter_by(studentID=student.user_id).first().totalHours, 3)
+
+    def test_recompute_repairs_drift(self):
+        staff = register_staff("ledgerstaff3", "ledgerstaff3@example.com", "pass")
+        student = register_student("ledgerstud3", "ledgerstud3@example.com", "pass")
+        req = create_hours_request(student.user_id, 6.0)
+        process_request_approval(staff.user_id, req.id)
+        create_hours_request(student.user_id, 1.5)
+        db.session.execute(db.update(Student).values(totalHours=999, points=0, pendingHours=0))
+        db.session.execute(db.update(LeaderBoardEntry).values(totalHours=999))
+        db.session.commit()
+        self.assertEqual(generate_leaderboard(), [{'name': "ledgerstud3", 'hours': 999}])
+
+        self.assertGreaterEqual(recompute_student_totals(), 1)
+        student = db.session.get(Student, student.user_id)
+        self.assertEqual((student.totalHours, student.points, student.pendingHours), (6.0, 60, 1.5))
+        self.assertEqual(generate_leaderboard(), [{'name': "ledgerstud3", 'hours': 6.0}])
+
+        credit_hours(student.user_id, 0.5)
+        db.session.commit()
+        self.assertEqual(db.session.get(Student, student.user_id).points, 65)
+
+class MilestoneIntegrationTests(unittest.TestCase):
+
+    def test_crossed_milestones_between_totals(self):
+        self.assertEqual(crossed_milestones(0, 9.5), [])
+        self.assertEqual(crossed_milestones(9.5, 10), [10])
+        self.assertEqual(crossed_milestones(5, 60), [10, 25, 50])
+        self.assertEqual(crossed_milestones(60, 5), [])
+        self.assertEqual(get_next_milestone(10), 25)
+        self.assertEqual(get_milestone_progress(17.5), 50)
+        self.assertEqual(get_milestone_progress(150), 100)
+
+    def test_milestones_awarded_once_as_hours_grow(self):
+        staff = register_staff("msstaff", "msstaff@example.com", "pass")
+        student = register_student("msstudent", "msstudent@example.com", "pass")
+        for hours in (8, 4, 20):
+            req = create_hours_request(student.user_id, hours)
+            process_request_approval(staff.user_id, req.id)
+        result = process_request_approval(staff.user_id, create_hours_request(student.user_id, 1).id)
+        delete_logged_hours(result['logged_hours'].id)
+        record_logged_hours(staff.user_id, student.user_id, 1)
+        get_job_runner().run_pending()
+
+        awarded = sorted(a['milestoneHours'] for a in fetch_accolades(student.user_id))
+        self.assertEqual(awarded, [10, 25])
+        self.assertEqual(db.session.get(Student, student.user_id).accoladeCount, 2)
+
+    def test_recompute_awards_missing_milestones(self):
+        staff = register_staff("msstaff2", "msstaff2@example.com", "pass")
+        student = register_student("msstudent2", "msstudent2@example.com", "pass")
+        db.session.add(LoggedHours(student_id=student.user_id, staff_id=staff.user_id, hours=30.0, status='approved'))
+        db.session.commit()
+        self.assertEqual(fetch_accolades(student.user_id), [])
+
+        recompute_student_totals()
+        recompute_student_totals()
+        self.assertEqual(sorted(a['milestoneHours'] for a in fetch_accolades(student.user_id)), [10, 25])
+        self.assertEqual(db.session.get(Student, student.user_id).accoladeCount, 2)
+
+class PaginationIntegrationTests(unittest.TestCase):
+
+    def test_get_all_students_json_pages(self):
+        from App.controllers.student_controller import get_all_students_json
+        for i in range(5):
+            register_student(f"page{i}", f"page{i}@example.com", "pass")
+
+        first = get_all_students_json(limit=2)
+        self.assertEqual([s['username'] for s in first['items']], ["page0", "page1"])
+        self.assertIsNotNone(first['next_cursor'])
+
+        second = get_all_students_json(limit=2, after=first['next_cursor'])
+        self.assertEqual([s['username'] for s in second['items']], ["page2", "page3"])
+
+        last = get_all_students_json(limit=2, after=second['next_cursor'])
+        self.assertEqual([s['username'] for s in last['items']], ["page4"])
+        self.assertIsNone(last['next_cursor'])
+
+    def test_view_leaderboard_pages(self):
+        from App.controllers import view_leaderboard
+        staff = register_staff("pagestaff", "pagestaff@example.com", "pass")
+        for i, hours in enumerate([3.0, 5.0, 5.0, 1.0]):
+            student = register_student(f"lbpage{i}", f"lbpage{i}@example.com", "pass")
+            log_hours_for_student(staff.user_id, student.user_id, hours)
+
+        names = []
+        cursor = None
+        while True:
+            page = view_leaderboard(limit=3, after=cursor)
+            names.extend(entry['username'] for entry in page['items'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(names, ["lbpage1", "lbpage2", "lbpage0", "lbpage3"])
+
+    def test_api_pagination_invalid_cursor(self):
+        from flask import current_app
+        client = current_app.test_client()
+        response = client.get('/api/requests?after=abc')
+        self.assertEqual(response.status_code, 400)
+        response = client.get('/api/logged_hours?limit=5')
+        self.assertEqual(response.get_json(), {'items': [], 'next_cursor': None})
+
+class ExportIntegrationTests(unittest.TestCase):
+
+    def test_logged_hours_ndjson_export(self):
+        import json
+        from flask import current_app
+        student = register_student("exporter", "exporter@example.com", "pass")
+        db.session.add_all([
+            LoggedHours(student_id=student.user_id, staff_id=None, hours=float(i), status='approved')
+            for i in range(1, 4)
+        ])
+        db.session.commit()
+
+        response = current_app.test_client().get('/api/logged_hours?format=ndjson')
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([r['hours'] for r in records], [1.0, 2.0, 3.0])
+
+    def test_iter_requests_json_batches(self):
+        from App.controllers import iter_requests_json
+        student = register_student("batchexport", "batchexport@example.com", "pass")
+        for hours in (1.0, 2.0, 3.0):
+            create_hours_request(student.user_id, hours)
+
+        records = list(iter_requests_json(batch_size=2))
+        self.assertEqual([r['hours'] for r in records], [1.0, 2.0, 3.0])
+
+class IndexIntegrationTests(unittest.TestCase):
+
+    def query_plan(self, stmt):
+        from sqlalchemy import text
+        sql = str(stmt.compile(db.engine, compile_kwargs={"literal_binds": True}))
+        rows = db.session.execute(text("EXPLAIN QUERY PLAN " + sql)).all()
+        return " ".join(row[-1] for row in rows)
+
+    def test_pending_requests_use_status_index(self):
+        from App.controllers.staff_controller import _request_select
+        stmt = _request_select().filter(Request.status == 'pending').order_by(Request.timestamp, Request.id)
+        self.assertIn("ix_request_status_timestamp", self.query_plan(stmt))
+
+    def test_per_student_queries_use_student_indexes(self):
+        from sqlalchemy import func
+        hours = db.select(func.sum(LoggedHours.hours)) \
+            .filter(LoggedHours.student_id == 1, LoggedHours.status == 'approved')
+        self.assertIn("ix_logged_hours_student_status", self.query_plan(hours))
+
+        pending = db.select(func.sum(Request.hours)) \
+            .filter(Request.student_id == 1, Request.status == 'pending')
+        self.assertIn("ix_request_student_status", self.query_plan(pending))
+
+        activities = db.select(Activity).filter(Activity.studentID == 1)
+        self.assertRegex(self.query_plan(activities), "ix_activity_student_(status|date)")
+
+        accolades = db.select(Accolade).filter(Accolade.studentID == 1)
+        self.assertIn("ix_accolade_student", self.query_plan(accolades))
+
+    def test_pending_activities_use_status_index(self):
+        stmt = db.select(Activity).filter(Activity.status == 'Pending')
+        self.assertIn("ix_activity_status_date", self.query_plan(stmt))
+
+class InstrumentationIntegrationTests(unittest.TestCase):
+
+    def test_server_timing_and_metrics(self):
+        app = create_test_app({'INSTRUMENTATION_ENABLED': True})
+        client = app.test_client()
+
+        response = client.get('/api/students')
+        timing = response.headers.get_all('Server-Timing')
+        self.assertTrue(timing[0].startswith('app;dur='))
+        self.assertIn('queries', timing[1])
+
+        metrics = client.get('/metrics').get_data(as_text=True)
+        self.assertIn('app_requests_total{endpoint="user_views.get_students_action",method="GET",status="200"} 1', metrics)
+        self.assertIn('app_request_queries_total{endpoint="user_views.get_students_action"', metrics)
+
+    def test_slow_request_warning(self):
+        app = create_test_app({'INSTRUMENTATION_ENABLED': True, 'INSTRUMENTATION_MAX_QUERIES': 0})
+        with self.assertLogs('App.instrumentation', level='WARNING') as logs:
+            app.test_client().get('/api/students')
+        self.assertIn('Slow request GET /api/students', logs.output[0])
+
+    def test_pool_metrics(self):
+        from App.instrumentation import InstrumentedQueuePool
+        app = create_test_app({
+            'INSTRUMENTATION_ENABLED': True,
+            'SQLALCHEMY_ENGINE_OPTIONS': {'poolclass': InstrumentedQueuePool, 'pool_size': 2, 'max_overflow': 0}
+        })
+        client = app.test_client()
+        client.get('/api/students')
+        metrics = client.get('/metrics').get_data(as_text=True)
+        self.assertIn('app_db_pool_size 2', metrics)
+        self.assertIn('app_db_pool_checked_out', metrics)
+        checkouts = [line for line in metrics.splitlines() if line.startswith('app_db_pool_checkouts_total ')]
+        self.assertGreaterEqual(int(checkouts[0].split()[1]), 1)
+
+    def test_engine_options_from_env(self):
+        from unittest import mock
+        from App.config import engine_options_from_env
+        with mock.patch.dict(os.environ, {'DB_POOL_SIZE': '3', 'DB_MAX_OVERFLOW': '1', 'DB_STATEMENT_TIMEOUT_MS': '5000'}):
+            options = engine_options_from_env()
+        self.assertEqual((options['pool_size'], options['max_overflow']), (3, 1))
+        self.assertTrue(options['pool_pre_ping'])
+        self.assertEqual(options['connect_args'], {'options': '-c statement_timeout=5000'})
+
+    def test_instrumentation_disabled_by_default(self):
+        from flask import current_app
+        response = current_app.test_client().get('/api/students')
+        self.assertNotIn('Server-Timing', response.headers)
+
+class HttpCacheIntegrationTests(unittest.TestCase):
+
+    def test_leaderboard_not_modified_until_write(self):
+        from flask import current_app
+        from unittest import mock
+        staff = register_staff("etagstaff", "etagstaff@example.com", "pass")
+        student = register_student("etagstudent", "etagstudent@example.com", "pass")
+        client = current_app.test_client()
+
+        first = client.get('/api/leaderboard')
+        etag = first.headers['ETag']
+        self.assertEqual(first.headers['Cache-Control'], 'public, max-age=5')
+        with mock.patch('App.views.user.view_leaderboard') as aggregate:
+            cached = client.get('/api/leaderboard', headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+        aggregate.assert_not_called()
+
+        req = create_hours_request(student.user_id, 3.0)
+        process_request_approvals(staff.user_id, [req.id])
+        fresh = client.get('/api/leaderboard', headers={'If-None-Match': etag})
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh.headers['ETag'], etag)
+
+    def test_rename_changes_leaderboard_etag(self):
+        from flask import current_app
+        student = register_student("etagrename", "etagrename@example.com", "pass")
+        client = current_app.test_client()
+        etag = client.get('/api/leaderboard').headers['ETag']
+
+        update_user(student.user_id, "etagrenamed")
+        fresh = client.get('/api/leaderboard', headers={'If-None-Match': etag})
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual([entry['username'] for entry in fresh.get_json()['items']], ["etagrenamed"])
+
+    def test_per_user_not_modified_skips_user_lookup(self):
+        from flask import current_app
+        from sqlalchemy import event
+        register_student("etagsession", "etagsession@example.com", "pass")
+        client = current_app.test_client()
+        client.post('/auth/login', data={'username': "etagsession", 'password': "pass"})
+        etag = client.get('/student/leaderboard').headers['ETag']
+
+        statements = []
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", capture)
+        try:
+            response = client.get('/student/leaderboard', headers={'If-None-Match': etag})
+        finally:
+            event.remove(db.engine, "before_cursor_execute", capture)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual([s for s in statements if "FROM users" in s], [])
+
+    def test_version_bumped_only_by_committed_writes(self):
+        from App.controllers.data_version_controller import get_data_version
+        student = register_student("etagstudent2", "etagstudent2@example.com", "pass")
+        version, updated = get_data_version()
+
+        db.session.add(Request(student_id=student.user_id, hours=1.0))
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(get_data_version()[0], version)
+
+        create_hours_request(student.user_id, 1.0)
+        self.assertEqual(get_data_version()[0], version + 1)
+
+    def test_cache_control_configurable(self):
+        app = create_test_app({'HTTP_CACHE_CONTROL': {}, 'HTTP_CACHE_CONTROL_DEFAULT': 'public, max-age=30'})
+        response = app.test_client().get('/api/leaderboard')
+        self.assertEqual(response.headers['Cache-Control'], 'public, max-age=30')
+
+class ResultCacheIntegrationTests(unittest.TestCase):
+
+    def test_memory_backend_lru_and_ttl(self):
+        from App.cache import MemoryBackend
+        backend = MemoryBackend(max_entries=2)
+        backend.set('a', 1, 60)
+        backend.set('b', 2, 60)
+        backend.get('a')
+        backend.set('c', 3, 60)
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.get('a')[0], 1)
+        backend.set('d', 4, -1)
+        self.assertIsNone(backend.get('d'))
+
+    def test_sqlite_backend_shared_between_caches(self):
+        from App.cache import ResultCache, SQLiteBackend
+        path = os.path.join(tempfile.mkdtemp(), 'cache.db')
+        first, second = ResultCache(SQLiteBackend(path)), ResultCache(SQLiteBackend(path))
+        self.assertEqual(first.get_or_set('students', '100:', lambda: {'items': [1]}), {'items': [1]})
+        self.assertEqual(second.get_or_set('students', '100:', lambda: {'items': []}), {'items': [1]})
+        second.invalidate('students')
+        self.assertEqual(first.get_or_set('students', '100:', lambda: {'items': [2]}), {'items': [2]})
+        self.assertEqual(second.stats(), {'students': {'hits': 1, 'misses': 0}})
+
+    def test_memory_cache_follows_writes_from_other_workers(self):
+        from flask import current_app
+        staff = register_staff("workerstaff", "workerstaff@example.com", "pass")
+        student = register_student("workerstudent", "workerstudent@example.com", "pass")
+        # a second app has its own in-process LRU, like another gunicorn worker
+        other = create_test_app({}).test_client()
+        first = other.get('/api/leaderboard')
+        self.assertEqual(first.get_json()['items'][0]['total_approved_hours'], 0)
+
+        process_request_approval(staff.user_id, create_hours_request(student.user_id, 3.0).id)
+        fresh = other.get('/api/leaderboard', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(fresh.get_json()['items'][0]['total_approved_hours'], 3.0)
+        revalidated = other.get('/api/leaderboard', headers={'If-None-Match': fresh.headers['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_writes_invalidate_cached_results(self):
+        from App.cache import get_cache
+        staff = register_staff("cachestaff", "cachestaff@example.com", "pass")
+        student = register_student("cachestudent", "cachestudent@example.com", "pass")
+        self.assertEqual(generate_leaderboard(), [{'name': "cachestudent", 'hours': 0}])
+        self.assertEqual(fetch_accolades(student.user_id), [])
+        generate_leaderboard()
+
+        for _ in range(2):
+            req = create_hours_request(student.user_id, 6.0)
+            process_request_approval(staff.user_id, req.id)
+        get_job_runner().run_pending()
+        db.session.rollback()
+        self.assertEqual(generate_leaderboard(), [{'name': "cachestudent", 'hours': 12.0}])
+        self.assertEqual([a['milestoneHours'] for a in fetch_accolades(student.user_id)], [10])
+        self.assertEqual(get_cache().stats()['leaderboard'], {'hits': 1, 'misses': 2})
+
+    def test_cache_metrics_exposed(self):
+        app = create_test_app({'INSTRUMENTATION_ENABLED': True})
+        client = app.test_client()
+        client.get('/api/students')
+        client.get('/api/students')
+        metrics = client.get('/metrics').get_data(as_text=True)
+        self.assertIn('app_cache_hits_total{namespace="students"} 1', metrics)
+        self.assertIn('app_cache_misses_total{namespace="students"} 1', metrics)
+
+class SQLiteTuningIntegrationTests(unittest.TestCase):
+
+    def test_connection_pragmas(self):
+        with db.engine.connect() as conn:
+            self.assertEqual(conn.exec_driver_sql("PRAGMA journal_mode").scalar(), 'wal')
+            self.assertEqual(conn.exec_driver_sql("PRAGMA busy_timeout").scalar(), 5000)
+            self.assertEqual(conn.exec_driver_sql("PRAGMA synchronous").scalar(), 1)
+
+    def test_write_controllers_begin_immediate(self):
+        staff = register_staff("lockstaff", "lockstaff@example.com", "pass")
+        student = register_student("lockstudent", "lockstudent@example.com", "pass")
+        req = create_hours_request(student.user_id, 2.0)
+        staff.username  # reload after commit, leaving a read-only deferred transaction open
+
+        begins = []
+        connection = db.session.connection().connection.driver_connection
+        connection.set_trace_callback(lambda sql: begins.append(sql) if sql.startswith('BEGIN') else None)
+        try:
+            process_request_approval(staff.user_id, req.id)
+            fetch_all_requests()
+        finally:
+            connection.set_trace_callback(None)
+        self.assertEqual(begins, ["BEGIN IMMEDIATE", "BEGIN"])
+
+class PasswordHashingIntegrationTests(unittest.TestCase):
+
+    def test_hashing_runs_on_bounded_pool(self):
+        import threading
+        from App.passwords import PasswordHasher
+        hasher = PasswordHasher('pbkdf2:sha256:1000', workers=2)
+        threads = []
+        hasher._submit(lambda: threads.append(threading.current_thread().name))
+        pwhash = hasher.hash("secret")
+        self.assertTrue(threads[0].startswith('password-hash'))
+        self.assertTrue(pwhash.startswith('pbkdf2:sha256:1000$'))
+        self.assertTrue(hasher.verify(pwhash, "secret"))
+        self.assertFalse(hasher.verify(pwhash, "wrong"))
+        self.assertFalse(hasher.needs_rehash(pwhash))
+        self.assertTrue(PasswordHasher('pbkdf2:sha256:2000', workers=0).needs_rehash(pwhash))
+        hasher.shutdown()
+
+    def test_login_rehashes_when_method_changes(self):
+        from App.controllers.auth import authenticate_user
+        student = register_student("rehash", "rehash@example.com", "pass")
+        self.assertTrue(student.password.startswith('scrypt:'))
+
+        app = create_test_app({'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000'})
+        with app.app_context():
+            self.assertIsNone(authenticate_user("rehash", "wrong"))
+            self.assertTrue(db.session.get(User, student.user_id).password.startswith('scrypt:'))
+            self.assertIsNotNone(authenticate_user("rehash", "pass"))
+            db.session.remove()
+        db.session.rollback()
+        self.assertTrue(db.session.get(User, student.user_id).password.startswith('pbkdf2:sha256:1000$'))
+        self.assertIsNotNone(login("rehash", "pass"))
+
+class RosterImportIntegrationTests(unittest.TestCase):
+
+    def test_import_csv_roster(self):
+        from App.controllers.roster_controller import import_roster
+        register_student("taken", "taken@example.com", "pass")
+        lines = [
+            "username,email,password,role\n",
+            "newstudent,newstudent@example.com,pw1,\n",
+            "newstaff,newstaff@example.com,pw2,staff\n",
+            "taken,other@example.com,pw3,student\n",
+            "again,newstudent@example.com,pw4,student\n",
+            "badrole,badrole@example.com,pw5,admin\n",
+            "nopass,nopass@example.com,,student\n",
+            "extra,extra@example.com,pw6,student,zzz\n",
+        ]
+        report = import_roster(lines, 'csv')
+        self.assertEqual(report['created'], {'students': 1, 'staff': 1})
+        self.assertEqual([(r['line'], r['reason']) for r in report['rejected']], [
+            (5, 'Duplicate username or email in roster'),
+            (6, 'Role must be one of student, staff'),
+            (7, 'username, email and password are required'),
+            (8, 'More fields than the header'),
+            (4, 'Username or email already exists'),
+        ])
+        self.assertNotIn('password', report['rejected'][0]['row'])
+
+        student = Student.query.filter_by(username="newstudent").one()
+        self.assertEqual(student.totalHours, 0)
+        self.assertIsNotNone(student.leaderboard_entry)
+        self.assertIsInstance(Staff.query.filter_by(username="newstaff").one(), Staff)
+        self.assertIsNotNone(login("newstudent", "pw1"))
+        self.assertIn("newstudent", [row['name'] for row in generate_leaderboard()])
+
+    def test_import_json_lines_with_process_pool(self):
+        import json
+        from App.controllers.roster_controller import import_roster, POOL_MIN_PASSWORDS, _hash_pool
+        app = create_test_app({'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000'})
+        lines = [json.dumps({'username': f"cohort{i}", 'email': f"cohort{i}@example.com", 'password': f"pw{i}"}) + "\n"
+                 for i in range(POOL_MIN_PASSWORDS)] + ["not json\n"]
+        with app.app_context():
+            report = import_roster(lines, 'json', chunk_size=POOL_MIN_PASSWORDS, processes=2)
+            db.session.remove()
+        # later imports reuse the same worker processes
+        self.assertIs(_hash_pool(2), _hash_pool(2))
+        self.assertEqual(report['created'], {'students': POOL_MIN_PASSWORDS, 'staff': 0})
+        self.assertEqual(report['rejected'][0]['reason'], 'Malformed JSON object')
+        student = Student.query.filter_by(username="cohort3").one()
+        self.assertTrue(student.password.startswith('pbkdf2:sha256:1000$'))
+        self.assertTrue(student.check_password("pw3"))
+
+    def test_import_hashes_without_write_lock(self):
+        import sqlite3
+        from unittest import mock
+        from werkzeug.security import generate_password_hash
+        from App import passwords
+        from App.controllers import roster_controller
+        path = db.engine.url.database
+        locked = []
+        hashed = []
+
+        def hash_and_probe(password, method):
+            hashed.append(password)
+            other = sqlite3.connect(path, timeout=0, isolation_level=None)
+            try:
+                other.execute("BEGIN IMMEDIATE")
+                other.execute("ROLLBACK")
+            except sqlite3.OperationalError:
+                locked.append(password)
+            finally:
+                other.close()
+            return generate_password_hash(password, method)
+
+        lines = ["username,email,password\n"] + [f"hashlock{i},hashlock{i}@example.com,pw{i}\n" for i in range(4)]
+        with mock.patch.object(passwords, 'generate_password_hash', hash_and_probe):
+            report = roster_controller.import_roster(lines, 'csv', chunk_size=2, processes=1)
+        self.assertEqual(report['created'], {'students': 4, 'staff': 0})
+        # small chunks go through the app's password hasher rather than hashing on the request thread
+        self.assertEqual(sorted(hashed), [f"pw{i}" for i in range(4)])
+        self.assertEqual(locked, [])
+
+    def test_import_rejects_rows_registered_during_import(self):
+        from unittest import mock
+        from App.controllers import roster_controller
+        register_student("racedrow", "racedrow@example.com", "pass")
+        existing_users = roster_controller._existing_users
+        calls = []
+
+        def miss_first_check(rows):
+            calls.append(rows)
+            # the first check runs before the concurrent registration commits
+            return (set(), set()) if len(calls) == 1 else existing_users(rows)
+
+        lines = ["username,email,password\n", "racedrow,other@example.com,pw\n", "freshrow,freshrow@example.com,pw\n"]
+        with mock.patch.object(roster_controller, '_existing_users', miss_first_check):
+            report = roster_controller.import_roster(lines, 'csv', processes=1)
+        self.assertEqual(report['created'], {'students': 1, 'staff': 0})
+        self.assertEqual([(r['line'], r['reason']) for r in report['rejected']], [(2, 'Username or email already exists')])
+        self.assertEqual(Student.query.filter_by(username="freshrow").count(), 1)
+
+    def test_bulk_endpoint_requires_staff(self):
+        from flask_jwt_extended import create_access_token
+        staff = register_staff("rosterstaff", "rosterstaff@example.com", "pass")
+        student = register_student("rosterstudent", "rosterstudent@example.com", "pass")
+        client = create_test_app({}).test_client()
+        body = "username,email,password\nbulk1,bulk1@example.com,pw\n"
+
+        client.set_cookie('access_token', create_access_token(identity=str(student.user_id)))
+        response = client.post('/api/users/bulk', data=body, content_type='text/csv')
+        self.assertEqual(response.status_code, 403)
+
+        client.set_cookie('access_token', create_access_token(identity=str(staff.user_id)))
+        response = client.post('/api/users/bulk', data=body, content_type='text/plain')
+        self.assertEqual(response.status_code, 400)
+        response = client.post('/api/users/bulk', data=body, content_type='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['created'], {'students': 1, 'staff': 0})
+
+@unittest.skipUnless(importlib.util.find_spec('aiosqlite'), "aiosqlite is not installed")
+class AsyncApiIntegrationTests(unittest.TestCase):
+
+    def call(self, api, path, query=b'', method='GET'):
+        import asyncio
+        messages = []
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        async def send(message):
+            messages.append(message)
+        scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query, 'headers': [],
+                 'http_version': '1.1', 'scheme': 'http', 'server': ('localhost', 80), 'root_path': ''}
+        async def run():
+            await api(scope, receive, send)
+            await api.engine.dispose()
+        asyncio.run(run())
+        body = b''.join(message.get('body', b'') for message in messages[1:])
+        return messages[0]['status'], json.loads(body) if body else None
+
+    def test_async_reads_match_sync_endpoints(self):
+        from App.async_api import AsyncReadAPI
+        staff = register_staff("asyncstaff", "asyncstaff@example.com", "pass")
+        students = [register_student(f"async{i}", f"async{i}@example.com", "pass") for i in range(3)]
+        for i, student in enumerate(students):
+            req = create_hours_request(student.user_id, 5.0 * (i + 1))
+            process_request_approval(staff.user_id, req.id)
+        create_hours_request(students[0].user_id, 2.0)
+
+        app = create_test_app({})
+        api = AsyncReadAPI(app)
+        client = app.test_client()
+        for path, query in (('/api/leaderboard', b'limit=2'), ('/api/requests', b'limit=2&after=1'),
+                            ('/api/logged_hours', b''), (f'/api/students/{students[0].user_id}/summary', b'')):
+            status, body = self.call(api, '/async' + path, query)
+            self.assertEqual(status, 200)
+            self.assertEqual(body, client.get(f"{path}?{query.decode()}").json)
+        self.assertEqual(body['pending_hours'], 2.0)
+
+        self.assertEqual(self.call(api, '/async/api/students/999/summary')[0], 404)
+        self.assertEqual(self.call(api, '/async/api/requests', b'after=x')[0], 400)
+        self.assertEqual(self.call(api, '/async/api/requests', method='POST')[0], 405)
+
+    def test_other_paths_fall_back_to_flask(self):
+        from App.async_api import AsyncReadAPI
+        register_student("fallback", "fallback@example.com", "pass")
+        status, body = self.call(AsyncReadAPI(create_test_app({})), '/api/students')
+        self.assertEqual(status, 200)
+        self.assertEqual([s['username'] for s in body['items']], ["fallback"])
+
+class JobQueueIntegrationTests(unittest.TestCase):
+
+    def test_approval_queues_milestone_award(self):
+        from App.models import Job
+        staff = register_staff("jobstaff", "jobstaff@example.com", "pass")
+        student = register_student("jobstudent", "jobstudent@example.com", "pass")
+        req = create_hours_request(student.user_id, 12)
+        process_request_approval(staff.user_id, req.id)
+
+        jobs = Job.query.all()
+        self.assertEqual([(job.name, job.status, job.payload) for job in jobs],
+                         [(AWARD_MILESTONES_JOB, 'queued', {'student_ids': [student.user_id]})])
+        self.assertEqual(fetch_accolades(student.user_id), [])
+
+        self.assertEqual(get_job_runner().run_pending(), 1)
+        db.session.rollback()
+        self.assertEqual(Job.query.count(), 0)
+        self.assertEqual([a['milestoneHours'] for a in fetch_accolades(student.user_id)], [10])
+        self.assertEqual(db.session.get(Student, student.user_id).accoladeCount, 1)
+
+        # a redelivered job awards nothing twice
+        self.assertEqual(award_reached_milestones([student.user_id]), {})
+        db.session.rollback()
+
+        # a gain that crosses no threshold queues nothing
+        process_request_approval(staff.user_id, create_hours_request(student.user_id, 2).id)
+        self.assertEqual(Job.query.count(), 0)
+
+    def test_idle_poll_takes_no_write_lock(self):
+        from unittest import mock
+        from flask import current_app
+        from App.jobs import JobRunner
+        runner = JobRunner(current_app, workers=0)
+        with mock.patch('App.jobs.begin_write') as begin_write:
+            self.assertEqual(runner.run_pending(), 0)
+        begin_write.assert_not_called()
+
+    def test_rolled_back_work_queues_nothing(self):
+        from App.models import Job
+        enqueue_job(AWARD_MILESTONES_JOB, {'student_ids': []})
+        db.session.rollback()
+        self.assertEqual(Job.query.count(), 0)
+
+    def test_failed_job_retries_then_fails(self):
+        from flask import current_app
+        from App.models import Job
+        from App.jobs import JobRunner, job_handler
+        calls = []
+
+        @job_handler('tests.flaky')
+        def flaky(fail_times):
+            calls.append(len(calls))
+            if len(calls) <= fail_times:
+                raise RuntimeError("flaky job failed")
+
+        runner = JobRunner(current_app, workers=0, retry_delay=0)
+        job_id = enqueue_job('tests.flaky', {'fail_times': 1}, max_attempts=2).id
+        db.session.commit()
+        self.assertEqual(runner.run_pending(), 2)
+        db.session.rollback()
+        self.assertEqual(len(calls), 2)
+        self.assertIsNone(db.session.get(Job, job_id))
+
+        job = enqueue_job('tests.flaky', {'fail_times': 5}, max_attempts=2)
+        db.session.commit()
+        runner.run_pending()
+        db.session.expire_all()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIn("flaky job failed", job.last_error)
+
+    def test_expired_lease_is_claimed_again(self):
+        from datetime import timedelta
+        from flask import current_app
+        from App.models import Job
+        from App.jobs import JobRunner
+        job = enqueue_job(AWARD_MILESTONES_JOB, {'student_ids': []})
+        # a worker claimed the job and died without reporting back
+        job.status, job.attempts, job.locked_by = 'running', 1, 'gone:1:job-worker-0'
+        job.run_at = datetime.utcnow() + timedelta(seconds=60)
+        db.session.commit()
+
+        runner = JobRunner(current_app, workers=0)
+        self.assertEqual(runner.run_pending(), 0)
+        job.run_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        self.assertEqual(runner.run_pending(), 1)
+        db.session.rollback()
+        self.assertEqual(Job.query.count(), 0)
+
+class ReplicaRoutingIntegrationTests(unittest.TestCase):
+
+    def test_reads_use_replica_until_session_commits(self):
+        from App.database import REPLICA_BIND
+        from App.controllers.student_controller import get_all_students_json
+        path = os.path.join(tempfile.mkdtemp(), 'replica.db')
+        app = create_test_app({'REPLICA_DATABASE_URL': f'sqlite:///{path}', 'CACHE_BACKEND': 'none'})
+        with app.app_context():
+            replica = db.engines[REPLICA_BIND]
+            db.metadata.create_all(replica)
+            with replica.begin() as conn:
+                conn.execute(db.insert(User), [{'user_id': 1, 'username': "replicaonly", 'email': "r@example.com",
+                                                'password': "x", 'role': "student"}])
+                conn.execute(db.insert(Student), [{'student_id': 1}])
+
+            # reads go to the replica, which only knows the student inserted above
+            self.assertEqual([s['username'] for s in get_all_students_json()['items']], ["replicaonly"])
+            self.assertIsNone(get_user_by_username("replicaonly"))
+
+            # after a write commits, the rest of the request reads its own writes from the primary
+            register_student("primaryonly", "p@example.com", "pass")
+            self.assertEqual([s['username'] for s in get_all_students_json()['items']], ["primaryonly"])
+            db.session.remove()
+
+            self.assertEqual([s['username'] for s in get_all_students_json()['items']], ["replicaonly"])
+            db.session.remove()
+            db.metadata.drop_all(replica)
+
+    def test_lagging_replica_body_keeps_its_own_version(self):
+        from App.database import REPLICA_BIND
+        from App.models import DataVersion
+        from App.controllers.data_version_controller import get_data_version
+        register_student("laggedstudent", "lagged@example.com", "pass")
+        primary_version = get_data_version()[0]
+        path = os.path.join(tempfile.mkdtemp(), 'replica.db')
+        app = create_test_app({'REPLICA_DATABASE_URL': f'sqlite:///{path}', 'CACHE_BACKEND': 'memory'})
+        client = app.test_client()
+        with app.app_context():
+            replica = db.engines[REPLICA_BIND]
+            db.metadata.create_all(replica)
+        try:
+            # the replica hasn't received the registration yet
+            stale = client.get('/api/leaderboard')
+            self.assertEqual(stale.get_json()['items'], [])
+            self.assertTrue(stale.headers['ETag'].startswith('"0-'))
+
+            with replica.begin() as conn:
+                conn.execute(db.insert(User), [{'user_id': 1, 'username': "laggedstudent", 'email': "lagged@example.com",
+                                                'password': "x", 'role': "student"}])
+                conn.execute(db.insert(Student), [{'student_id': 1}])
+                conn.execute(db.insert(LeaderBoardEntry), [{'entryID': "lagged", 'studentID': 1, 'totalHours': 0}])
+                conn.execute(db.insert(DataVersion), [{'name': 'hours', 'version': primary_version, 'updated': datetime.utcnow()}])
+            caught_up = client.get('/api/leaderboard', headers={'If-None-Match': stale.headers['ETag']})
+            self.assertEqual(caught_up.status_code, 200)
+            self.assertEqual([item['username'] for item in caught_up.get_json()['items']], ["laggedstudent"])
+            self.assertTrue(caught_up.headers['ETag'].startswith(f'"{primary_version}-'))
+        finally:
+            with app.app_context():
+                db.session.remove()
+                db.metadata.drop_all(replica)
+
+class SessionUserIntegrationTests(unittest.TestCase):
+
+    def test_one_user_lookup_per_page(self):
+        from flask import current_app
+        from sqlalchemy import event
+        student = register_student("cachedstudent", "cached@example.com", "pass")
+        client = current_app.test_client()
+        client.post('/auth/login', data={'username': "cachedstudent", 'password': "pass"})
+        db.session.expire_all()
+
+        statements = []
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", capture)
+        try:
+            response = client.get('/student/accolades')
+        finally:
+            event.remove(db.engine, "before_cursor_execute", capture)
+
+        self.assertEqual(response.status_code, 200)
+        user_lookups = [s for s in statements if "FROM users" in s and "users.user_id = ?" in s]
+        self.assertEqual(len(user_lookups), 1)
+        # resolving the user doesn't pull in the student's hours history
+        self.assertEqual([s for s in statements if "logged_hours" in s or "FROM request" in s], [])
+
+    def test_student_dashboard_query_count_fixed(self):
+        from flask import current_app
+        from sqlalchemy import event
+        from App.controllers.session_auth import load_user
+        student = register_student("historystud", "historystud@example.com", "pass")
+        client = current_app.test_client()
+        client.post('/auth/login', data={'username': "historystud", 'password': "pass"})
+
+        counts = []
+        for extra in (1, 25):
+            db.session.add_all([
+                LoggedHours(student_id=student.user_id, staff_id=None, hours=1.0, status='approved')
+                for _ in range(extra)
+            ])
+            db.session.add_all([Request(student_id=student.user_id, hours=1.0) for _ in range(extra)])
+            db.session.commit()
+            db.session.expire_all()
+
+            statements = []
+            def capture(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+            event.listen(db.engine, "before_cursor_execute", capture)
+            try:
+                self.assertEqual(client.get('/student/dashboard').status_code, 200)
+            finally:
+                event.remove(db.engine, "before_cursor_execute", capture)
+            counts.append(len(statements))
+
+        self.assertEqual(counts[0], counts[1])
+        self.assertLessEqual(counts[1], 6)
+        self.assertIsInstance(load_user(student.user_id), Student)
+
+    def test_jwt_user_resolved_once(self):
+        from flask import current_app, g
+        from App.controllers.session_auth import get_request_user
+        student = register_student("jwtstudent", "jwt@example.com", "pass")
+        with current_app.test_request_context():
+            first = get_request_user(student.user_id)
+            self.assertIs(get_request_user(student.user_id), first)
+            self.assertIn(student.user_id, g.request_users)
+
 # Negative Test Cases
 class NegativeTests(unittest.TestCase):
     
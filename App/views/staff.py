@@ -2,31 +2,21 @@ from flask import Blueprint, render_template, jsonify, request, flash, redirect,
 from flask_jwt_extended import jwt_required, current_user as jwt_current_user
 from App.models import Student, Request, LoggedHours
 from App.controllers.student_controller import get_all_students_json, fetch_accolades, create_hours_request, generate_leaderboard
-from App.controllers.staff_controller import process_request_approval, process_request_denial, fetch_all_requests
+from App.controllers.staff_controller import process_request_approval, process_request_denial, fetch_all_requests, fetch_request_detail, process_request_approvals, process_request_denials, import_logged_hours_csv, record_logged_hours, delete_logged_hours, delete_request
 from App.controllers.session_auth import staff_required, get_current_user
+from App.http_cache import conditional_get
+from App.controllers.milestone_controller import milestones_reached, get_milestone_progress
 from App import db
 
 staff_views = Blueprint('staff_views', __name__, template_folder='../templates')
 
 
-def get_next_milestone(hours):
-    milestones = [10, 25, 50, 100]
-    for m in milestones:
-        if hours < m:
-            return m
-    return milestones[-1]
-
-
 @staff_views.route('/staff/dashboard', methods=['GET'])
 @staff_required
 def staff_dashboard():
     user = get_current_user()
     
     pending_requests = fetch_all_requests()
-    for req in pending_requests:
-        r = Request.query.get(req['id'])
-        if r:
-            req['timestamp'] = r.timestamp.strftime('%Y-%m-%d %H:%M')
     
     return render_template('staff/dashboard.html',
         pending_requests=pending_requests,
@@ -48,9 +38,7 @@ def staff_log_hours():
             return redirect(url_for('staff_views.staff_log_hours'))
         
         try:
-            logged = LoggedHours(student_id=student_id, staff_id=user.staff_id, hours=hours, status='approved')
-            db.session.add(logged)
-            db.session.commit()
+            record_logged_hours(user.staff_id, student_id, hours)
             flash(f'Successfully logged {hours} hours!', 'success')
             return redirect(url_for('staff_views.staff_dashboard'))
         except Exception as e:
@@ -60,14 +48,41 @@ def staff_log_hours():
     return render_template('staff/log_hours.html', students=students)
 
 
+def uploaded_csv_lines():
+    """Return the uploaded CSV as a stream of text lines, or None if missing or not allowed."""
+    import io
+    from flask_uploads import extension
+    from App.main import photos
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return None
+    ext = extension(upload.filename).lower()
+    if ext != 'csv' or not photos.extension_allowed(ext):
+        return None
+    return io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+
+
+@staff_views.route('/staff/import-hours', methods=['POST'])
+@staff_required
+def staff_import_hours():
+    user = get_current_user()
+    lines = uploaded_csv_lines()
+    if lines is None:
+        flash('Please upload a .csv file', 'error')
+        return redirect(url_for('staff_views.staff_log_hours'))
+
+    try:
+        report = import_logged_hours_csv(user.staff_id, lines)
+        flash(f"Imported {report['inserted']} rows ({report['rows_per_sec']:.0f} rows/sec), rejected {len(report['rejected'])}", 'success')
+    except Exception as e:
+        flash(f'Error importing hours: {str(e)}', 'error')
+    return redirect(url_for('staff_views.staff_log_hours'))
+
+
 @staff_views.route('/staff/requests', methods=['GET'])
 @staff_required
 def staff_requests():
     pending_requests = fetch_all_requests()
-    for req in pending_requests:
-        r = Request.query.get(req['id'])
-        if r:
-            req['timestamp'] = r.timestamp.strftime('%Y-%m-%d %H:%M')
     
     return render_template('staff/requests.html',
         pending_requests=pending_requests,
@@ -78,25 +93,12 @@ def staff_requests():
 @staff_views.route('/staff/request/<int:request_id>', methods=['GET'])
 @staff_required
 def staff_request_detail(request_id):
-    req = Request.query.get(request_id)
-    if not req:
+    selected_request = fetch_request_detail(request_id)
+    if not selected_request:
         flash('Request not found', 'error')
         return redirect(url_for('staff_views.staff_requests'))
     
-    student = Student.query.get(req.student_id)
-    selected_request = {
-        'id': req.id,
-        'student_name': student.username if student else 'Unknown',
-        'hours': req.hours,
-        'timestamp': req.timestamp.strftime('%Y-%m-%d %H:%M'),
-        'status': req.status
-    }
-    
     pending_requests = fetch_all_requests()
-    for r in pending_requests:
-        req_obj = Request.query.get(r['id'])
-        if req_obj:
-            r['timestamp'] = req_obj.timestamp.strftime('%Y-%m-%d %H:%M')
     
     return render_template('staff/requests.html',
         pending_requests=pending_requests,
@@ -134,35 +136,18 @@ def deny_request(request_id):
 
 @staff_views.route('/staff/leaderboard', methods=['GET'])
 @staff_required
+@conditional_get(vary_by_user=True)
 def staff_leaderboard():
     leaderboard_data = generate_leaderboard()
     
     leaderboard = []
     for entry in leaderboard_data:
         hours = entry['hours']
-        accolades = []
-        if hours >= 10:
-            accolades.append('10h')
-        if hours >= 25:
-            accolades.append('25h')
-        if hours >= 50:
-            accolades.append('50h')
-        
-        next_m = get_next_milestone(hours)
-        if next_m == 10:
-            progress = min(100, int((hours / 10) * 100))
-        elif next_m == 25:
-            progress = min(100, int(((hours - 0) / 25) * 100))
-        elif next_m == 50:
-            progress = min(100, int(((hours - 0) / 50) * 100))
-        else:
-            progress = 100
-        
         leaderboard.append({
             'name': entry['name'],
             'hours': hours,
-            'accolades': accolades,
-            'milestone_progress': progress
+            'accolades': [f"{m}h" for m in milestones_reached(hours)],
+            'milestone_progress': get_milestone_progress(hours)
         })
     
     return render_template('leaderboard.html', leaderboard=leaderboard)
@@ -202,6 +187,58 @@ def deny_request_action():
     return jsonify(message='Request denied'), 200
 
 
+def batch_request_ids():
+    data = request.json
+    if not data or not isinstance(data.get('request_ids'), list):
+        return None
+    try:
+        return [int(request_id) for request_id in data['request_ids']]
+    except (TypeError, ValueError):
+        return None
+
+
+@staff_views.route('/api/accept_requests', methods=['PUT'])
+@jwt_required()
+def accept_requests_action():
+    user = jwt_current_user
+    if user.role != 'staff':
+        return jsonify(message='Access forbidden: Not a staff member'), 403
+    request_ids = batch_request_ids()
+    if request_ids is None:
+        return jsonify(message='Invalid request data'), 400
+    results = process_request_approvals(user.staff_id, request_ids)
+    return jsonify(results=results), 200
+
+
+@staff_views.route('/api/deny_requests', methods=['PUT'])
+@jwt_required()
+def deny_requests_action():
+    user = jwt_current_user
+    if user.role != 'staff':
+        return jsonify(message='Access forbidden: Not a staff member'), 403
+    request_ids = batch_request_ids()
+    if request_ids is None:
+        return jsonify(message='Invalid request data'), 400
+    results = process_request_denials(user.staff_id, request_ids)
+    return jsonify(results=results), 200
+
+
+@staff_views.route('/api/import_hours', methods=['POST'])
+@jwt_required()
+def import_hours_action():
+    user = jwt_current_user
+    if user.role != 'staff':
+        return jsonify(message='Access forbidden: Not a staff member'), 403
+    lines = uploaded_csv_lines()
+    if lines is None:
+        return jsonify(message='A .csv file upload is required'), 400
+    try:
+        report = import_logged_hours_csv(user.staff_id, lines)
+    except ValueError as e:
+        return jsonify(message=str(e)), 400
+    return jsonify(report), 200
+
+
 @staff_views.route('/api/delete_request', methods=['DELETE'])
 @jwt_required()
 def delete_request_action():
@@ -211,11 +248,8 @@ def delete_request_action():
     data = request.json
     if not data or 'request_id' not in data:
         return jsonify(message='Invalid request data'), 400
-    req = Request.query.get(data['request_id'])
-    if not req:
+    if not delete_request(data['request_id']):
         return jsonify(message='Request not found'), 404
-    db.session.delete(req)
-    db.session.commit()
     return jsonify(message='Request deleted'), 200
 
 
@@ -228,9 +262,6 @@ def delete_logs_action():
     data = request.json
     if not data or 'log_id' not in data:
         return jsonify(message='Invalid request data'), 400
-    log = LoggedHours.query.get(data['log_id'])
-    if not log:
+    if not delete_logged_hours(data['log_id']):
         return jsonify(message='Log not found'), 404
-    db.session.delete(log)
-    db.session.commit()
     return jsonify(message='Logs deleted'), 200
@@ -5,50 +5,37 @@ from App.controllers.student_controller import (
     get_all_students_json,
     fetch_accolades,
     create_hours_request,
-    get_activity_history,
+    get_activity_history_page,
     fetch_requests,
-    generate_leaderboard
+    generate_leaderboard,
+    get_recent_hours
 )
 from App.controllers.session_auth import student_required, get_current_user
+from App.http_cache import conditional_get
+from App.controllers.milestone_controller import (
+    MILESTONE_HOURS,
+    milestone_name,
+    milestones_reached,
+    get_next_milestone,
+    get_milestone_progress
+)
 from App import db
 
 student_views = Blueprint('student_views', __name__, template_folder='../templates')
 
 
-def get_next_milestone(hours):
-    milestones = [10, 25, 50, 100]
-    for m in milestones:
-        if hours < m:
-            return m
-    return milestones[-1]
-
-
-def calculate_milestone_progress(hours, next_milestone):
-    if next_milestone == 10:
-        return min(100, int((hours / 10) * 100))
-    elif next_milestone == 25:
-        return min(100, int(((hours - 10) / 15) * 100))
-    elif next_milestone == 50:
-        return min(100, int(((hours - 25) / 25) * 100))
-    elif next_milestone == 100:
-        return min(100, int(((hours - 50) / 50) * 100))
-    return 100
-
-
 @student_views.route('/student/dashboard', methods=['GET'])
 @student_required
 def student_dashboard():
     user = get_current_user()
     
-    confirmed_hours = sum(lh.hours for lh in user.loggedhours if lh.status == 'approved')
-    pending_hours = sum(r.hours for r in user.requests if r.status == 'pending')
+    confirmed_hours = user.totalHours or 0
+    pending_hours = user.pendingHours or 0
     next_milestone = get_next_milestone(confirmed_hours)
-    milestone_progress = calculate_milestone_progress(confirmed_hours, next_milestone)
+    milestone_progress = get_milestone_progress(confirmed_hours)
     
     recent_activities = []
-    all_entries = list(user.loggedhours) + list(user.requests)
-    all_entries.sort(key=lambda x: x.timestamp, reverse=True)
-    for entry in all_entries[:5]:
+    for entry in get_recent_hours(user.student_id, 5):
         recent_activities.append({
             'hours': entry.hours,
             'status': entry.status,
@@ -88,24 +75,18 @@ def request_hours():
 def student_accolades():
     user = get_current_user()
     
-    total_hours = sum(lh.hours for lh in user.loggedhours if lh.status == 'approved')
+    total_hours = user.totalHours or 0
     accolades = fetch_accolades(user.student_id)
     
-    all_milestones = [
-        {'name': '10 Hours Milestone', 'hours': 10},
-        {'name': '25 Hours Milestone', 'hours': 25},
-        {'name': '50 Hours Milestone', 'hours': 50},
-        {'name': '100 Hours Milestone', 'hours': 100}
-    ]
+    earned = {accolade['milestoneHours'] for accolade in accolades}
     
     upcoming_milestones = []
-    for m in all_milestones:
-        if m['name'] not in accolades:
-            progress = min(100, int((total_hours / m['hours']) * 100))
+    for hours in MILESTONE_HOURS:
+        if hours not in earned:
             upcoming_milestones.append({
-                'name': m['name'],
-                'hours': m['hours'],
-                'progress': progress
+                'name': milestone_name(hours),
+                'hours': hours,
+                'progress': min(100, int((total_hours / hours) * 100))
             })
     
     return render_template('student/accolades.html',
@@ -122,7 +103,7 @@ def student_confirmations():
     
     pending_requests = [r for r in user.requests if r.status == 'pending']
     confirmed_requests = [r for r in user.requests if r.status in ['approved', 'denied']]
-    total_confirmed = sum(lh.hours for lh in user.loggedhours if lh.status == 'approved')
+    total_confirmed = user.totalHours or 0
     
     selected_request = None
     if pending_requests:
@@ -163,45 +144,30 @@ def student_history():
     user = get_current_user()
     
     try:
-        history_data = get_activity_history(user.student_id)
-        history = list(enumerate(history_data, 1))
+        page = get_activity_history_page(user.student_id, after=request.args.get('after'))
+        history = list(enumerate(page['items'], 1))
+        next_cursor = page['next_cursor']
     except:
         history = []
+        next_cursor = None
     
-    return render_template('student/history.html', history=history)
+    return render_template('student/history.html', history=history, next_cursor=next_cursor)
 
 
 @student_views.route('/student/leaderboard', methods=['GET'])
 @student_required
+@conditional_get(vary_by_user=True)
 def student_leaderboard():
     leaderboard_data = generate_leaderboard()
     
     leaderboard = []
     for entry in leaderboard_data:
         hours = entry['hours']
-        accolades = []
-        if hours >= 10:
-            accolades.append('10h')
-        if hours >= 25:
-            accolades.append('25h')
-        if hours >= 50:
-            accolades.append('50h')
-        
-        next_m = get_next_milestone(hours)
-        if next_m == 10:
-            progress = min(100, int((hours / 10) * 100))
-        elif next_m == 25:
-            progress = min(100, int(((hours - 0) / 25) * 100))
-        elif next_m == 50:
-            progress = min(100, int(((hours - 0) / 50) * 100))
-        else:
-            progress = 100
-        
         leaderboard.append({
             'name': entry['name'],
             'hours': hours,
-            'accolades': accolades,
-            'milestone_progress': progress
+            'accolades': [f"{m}h" for m in milestones_reached(hours)],
+            'milestone_progress': get_milestone_progress(hours)
         })
     
     return render_template('leaderboard.html', leaderboard=leaderboard)
@@ -239,11 +205,14 @@ def activity_history_action():
     if user.role != 'student':
         return jsonify(message='Access forbidden: Not a student'), 403
     try:
-        history = get_activity_history(user.student_id)
+        page = get_activity_history_page(user.student_id, request.args.get('limit', type=int), request.args.get('after'))
         return jsonify({
             'student_id': user.student_id,
             'student_name': user.username,
-            'activity_history': history
+            'activity_history': page['items'],
+            'next_cursor': page['next_cursor']
         }), 200
     except ValueError as e:
+        if request.args.get('after'):
+            return jsonify(message='Invalid pagination cursor'), 400
         return jsonify(message=str(e)), 404
@@ -1,8 +1,8 @@
-from flask import Blueprint, render_template, jsonify, request, send_from_directory, flash, redirect, url_for
+from flask import Blueprint, render_template, jsonify, request, send_from_directory, flash, redirect, url_for, Response, stream_with_context, current_app
 from flask_jwt_extended import jwt_required, current_user as jwt_current_user
 from App.models import Student, Staff, User
 from.index import index_views
-from App.controllers.student_controller import get_all_students_json,register_student
+from App.controllers.student_controller import get_all_students_json,register_student,get_student_summary
 from App.controllers.staff_controller import get_all_staff_json,register_staff
 from App.controllers import (
     create_user,
@@ -11,8 +11,12 @@ from App.controllers import (
     jwt_required,
     view_leaderboard,
     get_all_requests_json,
-    get_all_logged_hours_json
+    get_all_logged_hours_json,
+    iter_requests_json,
+    iter_logged_hours_json
 )
+from App.controllers.roster_controller import import_roster
+from App.http_cache import conditional_get
 
 user_views = Blueprint('user_views', __name__, template_folder='../templates')
 
@@ -28,10 +32,34 @@ def create_user_action():
     create_user(data['username'], data['password'],data['email'])
     return redirect(url_for('user_views.get_user_page'))
 
+def page_args():
+    """Read the `limit` and `after` keyset pagination parameters."""
+    return request.args.get('limit', type=int), request.args.get('after')
+
+def paginated(fetch_page):
+    """Call a get_all_*_json controller with the request's page arguments."""
+    limit, after = page_args()
+    try:
+        return jsonify(fetch_page(limit=limit, after=after))
+    except ValueError:
+        return jsonify(message='Invalid pagination cursor'), 400
+
+def ndjson_response(records, flush_every=1000):
+    """Stream records as newline-delimited JSON without building the full body."""
+    def generate():
+        lines = []
+        for record in records:
+            lines.append(current_app.json.dumps(record) + '\n')
+            if len(lines) >= flush_every:
+                yield ''.join(lines)
+                lines = []
+        if lines:
+            yield ''.join(lines)
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @user_views.route('/api/users', methods=['GET'])
 def get_users_action():
-    users = get_all_users_json()
-    return jsonify(users)
+    return paginated(get_all_users_json)
 
 @user_views.route('/api/users', methods=['POST'])
 def create_user_endpoint():
@@ -42,53 +70,87 @@ def create_user_endpoint():
 @user_views.route('/api/create_Student', methods=['POST'])
 def create_student_endpoint():
     data = request.json
-    
-    users = User.query.all()
-    for u in users:
-        if u.email == data['email'] or u.username == data['name']:
-            return jsonify({'message': f"User with email {data['email']} already exists or username {data['name']}."}), 400
-    
-    student = register_student(data['name'], data['email'], data['password'])
+
+    try:
+        student = register_student(data['name'], data['email'], data['password'])
+    except ValueError:
+        return jsonify({'message': f"User with email {data['email']} already exists or username {data['name']}."}), 400
     return jsonify({'message': f"Student {student.username} created with id {student.student_id}"})
 
 @user_views.route('/api/create_Staff', methods=['POST'])
 def create_staff_endpoint():
     data = request.json
 
-    users = User.query.all()
-    for u in users:
-        if u.email == data['email'] or u.username == data['name']:
-            return jsonify({'message': f"User with email {data['email']} already exists or username {data['name']}."}), 400
-
-    staff = register_staff(data['name'], data['email'], data['password'])
+    try:
+        staff = register_staff(data['name'], data['email'], data['password'])
+    except ValueError:
+        return jsonify({'message': f"User with email {data['email']} already exists or username {data['name']}."}), 400
     return jsonify({'message': f"Staff {staff.username} created with id {staff.staff_id}"})
 
+ROSTER_FORMATS = {'csv': 'csv', 'json': 'json', 'jsonl': 'json', 'ndjson': 'json',
+                  'text/csv': 'csv', 'application/json': 'json', 'application/x-ndjson': 'json'}
+
+def roster_upload():
+    """Return (format, text lines) for a roster sent as a 'file' upload or as the request body."""
+    import io
+    upload = request.files.get('file')
+    if upload and upload.filename:
+        fmt = ROSTER_FORMATS.get(upload.filename.rsplit('.', 1)[-1].lower())
+        stream = upload.stream
+    else:
+        fmt = ROSTER_FORMATS.get(request.mimetype)
+        stream = request.stream
+    if fmt is None:
+        return None, None
+    return fmt, io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+@user_views.route('/api/users/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_users_action():
+    if jwt_current_user.role != 'staff':
+        return jsonify(message='Access forbidden: Not a staff member'), 403
+    fmt, lines = roster_upload()
+    if lines is None:
+        return jsonify(message='Send a .csv or .jsonl roster as a file upload or request body'), 400
+    try:
+        report = import_roster(lines, fmt)
+    except ValueError as e:
+        return jsonify(message=str(e)), 400
+    return jsonify(report), 200
+
 @user_views.route('/static/users', methods=['GET'])
 def static_user_page():
   return send_from_directory('static', 'static-user.html')
 
 @user_views.route('/api/students', methods=['GET'])
 def get_students_action():
-    students = get_all_students_json()
-    return jsonify(students)
+    return paginated(get_all_students_json)
+
+@user_views.route('/api/students/<int:student_id>/summary', methods=['GET'])
+def student_summary_action(student_id):
+    summary = get_student_summary(student_id)
+    if summary is None:
+        return jsonify(message='Student not found'), 404
+    return jsonify(summary)
 
 @user_views.route('/api/staff', methods=['GET'])
 def get_staff_action():
-    staff_members = get_all_staff_json()
-    return jsonify(staff_members)
+    return paginated(get_all_staff_json)
 
 
 @user_views.route('/api/leaderboard', methods=['GET'])
+@conditional_get()
 def leaderboard_action():
-    leaderboard = view_leaderboard()
-    return jsonify(leaderboard)
+    return paginated(view_leaderboard)
 
 @user_views.route('/api/requests', methods=['GET'])
 def requests_action():
-    requests = get_all_requests_json()
-    return jsonify(requests)
+    if request.args.get('format') == 'ndjson':
+        return ndjson_response(iter_requests_json())
+    return paginated(get_all_requests_json)
 
 @user_views.route('/api/logged_hours', methods=['GET'])
 def logged_hours_action():
-    logs = get_all_logged_hours_json()
-    return jsonify(logs)
\ No newline at end of file
+    if request.args.get('format') == 'ndjson':
+        return ndjson_response(iter_logged_hours_json())
+    return paginated(get_all_logged_hours_json)
\ No newline at end of file
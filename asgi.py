@@ -0,0 +1,7 @@
+# ASGI entry point: serves the async read API under /async/api and the rest of the app through Flask.
+# Run with e.g. `uvicorn asgi:application --workers 4`.
+from App.main import create_app
+from App.async_api import AsyncReadAPI
+
+app = create_app()
+application = AsyncReadAPI(app)
@@ -0,0 +1,25 @@
+"""Compare two benchmark result files: python benchmarks/compare.py old.json new.json"""
+import json
+import sys
+
+
+def main(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    print(f"{'benchmark':<32} {'old (ms)':>10} {'new (ms)':>10} {'change':>8}")
+    for name in sorted(set(old['benchmarks']) | set(new['benchmarks'])):
+        before = old['benchmarks'].get(name, {}).get('median')
+        after = new['benchmarks'].get(name, {}).get('median')
+        if before is None or after is None:
+            print(f"{name:<32} {'-' if before is None else f'{before * 1000:.2f}':>10} {'-' if after is None else f'{after * 1000:.2f}':>10}")
+            continue
+        print(f"{name:<32} {before * 1000:>10.2f} {after * 1000:>10.2f} {after / before:>7.2f}x")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    main(sys.argv[1], sys.argv[2])
@@ -0,0 +1,116 @@
+import json, os, platform, statistics, subprocess, time
+from datetime import datetime
+
+import pytest
+
+from App.main import create_app
+from App.database import db
+from App.controllers import generate_synthetic_data
+
+# Named dataset sizes; BENCH_<TABLE> environment variables override single counts
+SCALES = {
+    'small': dict(students=1000, staff=50, logged_hours=20000, requests=5000, activities=5000, accolades=1000),
+    'medium': dict(students=10000, staff=200, logged_hours=400000, requests=100000, activities=50000, accolades=20000),
+    'production': dict(students=50000, staff=500, logged_hours=2000000, requests=500000, activities=200000, accolades=100000),
+}
+
+RESULTS = {}
+
+
+def dataset_counts():
+    counts = dict(SCALES[os.environ.get('BENCH_SCALE', 'small')])
+    for table in counts:
+        override = os.environ.get(f'BENCH_{table.upper()}')
+        if override:
+            counts[table] = int(override)
+    return counts
+
+
+@pytest.fixture(scope='session')
+def bench_app():
+    """App bound to a benchmark database seeded once per session.
+
+    BENCH_DATABASE_URL selects the database (a SQLite file by default). The
+    data is regenerated unless BENCH_REUSE_DB=1 and the database already
+    holds students. The result cache is off unless BENCH_CACHE_BACKEND is
+    set, so the numbers reflect the queries themselves. Background jobs are
+    queued but not run, so they don't compete with the code being timed.
+    """
+    uri = os.environ.get('BENCH_DATABASE_URL', 'sqlite:///benchmark.db')
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': uri,
+                      'CACHE_BACKEND': os.environ.get('BENCH_CACHE_BACKEND', 'none'), 'JOBS_WORKERS': 0})
+    counts = dataset_counts()
+    from App.models import Student
+    if not (os.environ.get('BENCH_REUSE_DB') == '1' and db.session.query(Student.student_id).first()):
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        generate_synthetic_data(seed=int(os.environ.get('BENCH_SEED', 42)), **counts)
+        RESULTS['_generate_seconds'] = time.perf_counter() - started
+    RESULTS['_dataset'] = counts
+    yield app
+    db.session.remove()
+
+
+class Benchmark:
+    """Minimal pytest-benchmark style timer: runs a callable for several rounds."""
+
+    def __init__(self, name, rounds, warmup):
+        self.name = name
+        self.rounds = rounds
+        self.warmup = warmup
+
+    def __call__(self, fn, *args, **kwargs):
+        for _ in range(self.warmup):
+            fn(*args, **kwargs)
+        timings = []
+        result = None
+        for _ in range(self.rounds):
+            started = time.perf_counter()
+            result = fn(*args, **kwargs)
+            timings.append(time.perf_counter() - started)
+        self.record(timings)
+        return result
+
+    def record(self, timings, **extra):
+        """Store summary statistics for `timings` plus any extra values under this benchmark's name."""
+        RESULTS[self.name] = {
+            'rounds': len(timings),
+            'min': min(timings),
+            'max': max(timings),
+            'mean': statistics.mean(timings),
+            'median': statistics.median(timings),
+            'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            **extra,
+        }
+
+
+@pytest.fixture
+def benchmark(request, bench_app):
+    rounds = int(os.environ.get('BENCH_ROUNDS', 5))
+    warmup = int(os.environ.get('BENCH_WARMUP', 1))
+    return Benchmark(request.node.name, rounds, warmup)
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not RESULTS:
+        return
+    path = os.environ.get('BENCH_RESULTS', 'benchmark-results.json')
+    report = {
+        'revision': _git_revision(),
+        'created': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'database': os.environ.get('BENCH_DATABASE_URL', 'sqlite:///benchmark.db'),
+        'dataset': RESULTS.pop('_dataset', None),
+        'generate_seconds': RESULTS.pop('_generate_seconds', None),
+        'benchmarks': RESULTS,
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
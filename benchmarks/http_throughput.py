@@ -0,0 +1,115 @@
+"""Measure HTTP throughput and latency of a running deployment.
+
+Opens CONCURRENCY keep-alive connections and sends GET requests for
+DURATION seconds, then prints requests/sec and latency percentiles. Run it
+against both deployments on the same database to compare them:
+
+    gunicorn -c gunicorn_config.py wsgi:app
+    python benchmarks/http_throughput.py http://localhost:5000/api/leaderboard
+
+    uvicorn asgi:application --port 8000 --workers 4
+    python benchmarks/http_throughput.py http://localhost:8000/async/api/leaderboard
+
+Only the standard library is used, so the load generator adds no
+dependencies and stays cheap enough not to be the bottleneck.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    length = None
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding' and 'chunked' in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status
+
+
+async def _client(url, deadline, timings, errors):
+    parts = urlsplit(url)
+    target = parts.path + (f"?{parts.query}" if parts.query else '')
+    request = (f"GET {target or '/'} HTTP/1.1\r\nHost: {parts.netloc}\r\nConnection: keep-alive\r\n\r\n").encode()
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+            started = time.perf_counter()
+            writer.write(request)
+            status = await _read_response(reader)
+            timings.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            errors.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def run(url, concurrency, duration):
+    timings = []
+    errors = []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(_client(url, deadline, timings, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    quantiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else [0.0] * 99
+    return {
+        'url': url,
+        'concurrency': concurrency,
+        'requests': len(timings),
+        'errors': len(errors),
+        'requests_per_second': len(timings) / elapsed,
+        'p50': quantiles[49],
+        'p99': quantiles[98],
+        'max': max(timings, default=0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('url')
+    parser.add_argument('--concurrency', type=int, default=50, help='Open connections (default 50)')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds to run (default 10)')
+    parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.concurrency, args.duration))
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"{result['url']}: {result['requests_per_second']:.0f} req/s over {result['requests']} requests "
+          f"with {result['concurrency']} connections, {result['errors']} errors")
+    print(f"  p50 {result['p50'] * 1000:.1f} ms  p99 {result['p99'] * 1000:.1f} ms  max {result['max'] * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
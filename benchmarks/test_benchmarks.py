@@ -0,0 +1,161 @@
+"""Timing benchmarks for the hot read and approval paths.
+
+Run with `python -m pytest benchmarks`; see the Benchmarks section of the
+readme for the dataset and output settings.
+"""
+import os
+import statistics
+import time
+from threading import Thread
+
+from sqlalchemy import func
+
+from App.database import db
+from App.models import Student, Staff, Request, LoggedHours, Activity
+from App.controllers import generate_leaderboard, view_leaderboard
+from App.controllers.staff_controller import fetch_all_requests, process_request_approval, process_request_approvals
+from App.controllers.student_controller import get_activity_history
+
+
+def busiest(column):
+    return db.session.execute(
+        db.select(column).group_by(column).order_by(func.count().desc()).limit(1)
+    ).scalar()
+
+
+def logged_in_client(app, user_id, role):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+        sess['role'] = role
+    return client
+
+
+def pending_ids(count):
+    return db.session.scalars(
+        db.select(Request.id).filter(Request.status == 'pending').order_by(Request.id).limit(count)
+    ).all()
+
+
+def test_leaderboard(benchmark):
+    benchmark(generate_leaderboard)
+
+
+def test_leaderboard_cached(benchmark, bench_app):
+    from App.cache import ResultCache, MemoryBackend
+    previous = bench_app.extensions['result_cache']
+    bench_app.extensions['result_cache'] = ResultCache(MemoryBackend())
+    try:
+        benchmark(generate_leaderboard)
+    finally:
+        bench_app.extensions['result_cache'] = previous
+
+
+def test_leaderboard_api_page(benchmark):
+    benchmark(view_leaderboard, limit=100)
+
+
+def test_student_dashboard(benchmark, bench_app):
+    client = logged_in_client(bench_app, busiest(LoggedHours.student_id), 'student')
+    response = benchmark(client.get, '/student/dashboard')
+    assert response.status_code == 200
+
+
+def test_student_accolades_page(benchmark, bench_app):
+    client = logged_in_client(bench_app, busiest(LoggedHours.student_id), 'student')
+    response = benchmark(client.get, '/student/accolades')
+    assert response.status_code == 200
+
+
+def test_staff_dashboard(benchmark, bench_app):
+    staff_id = db.session.scalar(db.select(Staff.staff_id).limit(1))
+    client = logged_in_client(bench_app, staff_id, 'staff')
+    response = benchmark(client.get, '/staff/dashboard')
+    assert response.status_code == 200
+
+
+def test_pending_request_listing(benchmark):
+    benchmark(fetch_all_requests)
+
+
+def test_activity_history(benchmark):
+    benchmark(get_activity_history, busiest(Activity.studentID))
+
+
+def test_approve_single_request(benchmark):
+    staff_id = db.session.scalar(db.select(Staff.staff_id).limit(1))
+    queue = iter(pending_ids(benchmark.rounds + benchmark.warmup))
+    benchmark(lambda: process_request_approval(staff_id, next(queue)))
+
+
+def test_approve_request_batch(benchmark):
+    staff_id = db.session.scalar(db.select(Staff.staff_id).limit(1))
+    batch_size = 100
+    ids = pending_ids(batch_size * (benchmark.rounds + benchmark.warmup))
+    batches = iter([ids[i:i + batch_size] for i in range(0, len(ids), batch_size)])
+    benchmark(lambda: process_request_approvals(staff_id, next(batches)))
+
+
+def test_concurrent_approvals(benchmark, bench_app):
+    """BENCH_WRITERS threads, each with its own session, approving disjoint requests at once."""
+    writers = int(os.environ.get('BENCH_WRITERS', 4))
+    per_writer = benchmark.rounds * 10
+    staff_id = db.session.scalar(db.select(Staff.staff_id).limit(1))
+    ids = pending_ids(writers * per_writer)
+    db.session.rollback()
+    timings = []
+    errors = []
+
+    def approve(request_ids):
+        with bench_app.app_context():
+            for request_id in request_ids:
+                started = time.perf_counter()
+                try:
+                    process_request_approval(staff_id, request_id)
+                except Exception as e:
+                    db.session.rollback()
+                    errors.append(repr(e))
+                timings.append(time.perf_counter() - started)
+            db.session.remove()
+
+    threads = [Thread(target=approve, args=(ids[i::writers],)) for i in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    benchmark.record(timings, writers=writers, errors=len(errors), approvals_per_second=len(timings) / elapsed)
+    assert not errors, errors[:3]
+
+
+def test_concurrent_logins(benchmark, bench_app):
+    """BENCH_LOGIN_CLIENTS clients posting to /auth/login at once; hashing goes through the password pool."""
+    clients = int(os.environ.get('BENCH_LOGIN_CLIENTS', 8))
+    per_client = benchmark.rounds * 4
+    usernames = db.session.scalars(db.select(Student.username).order_by(Student.student_id).limit(clients)).all()
+    db.session.rollback()
+    timings = []
+    failures = []
+
+    def log_in(username):
+        client = bench_app.test_client()
+        for _ in range(per_client):
+            started = time.perf_counter()
+            response = client.post('/auth/login', data={'username': username, 'password': 'password'})
+            timings.append(time.perf_counter() - started)
+            if not response.headers.get('Location', '').endswith('/student/dashboard'):
+                failures.append(response.status_code)
+
+    threads = [Thread(target=log_in, args=(username,)) for username in usernames]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    benchmark.record(timings, clients=len(usernames), logins_per_second=len(timings) / elapsed,
+                     p99=statistics.quantiles(timings, n=100)[98])
+    assert not failures, failures[:3]
@@ -16,4 +16,10 @@ loglevel = 'info'
 
 # Where to log to
 accesslog = '-'  # '-' means log to stdout
-errorlog = '-'  # '-' means log to stderr
\ No newline at end of file
+errorlog = '-'  # '-' means log to stderr
+
+# psycopg2 is a C driver that gevent cannot monkey-patch; install a wait
+# callback so queries yield to other greenlets instead of blocking the worker.
+def post_fork(server, worker):
+    from App.database import make_psycopg2_green
+    make_psycopg2_green()
@@ -10,7 +10,11 @@ from App.main import create_app
 from App.controllers.student_controller import *
 from App.controllers.staff_controller import *
 from App.controllers.app_controller import *
-from App.controllers import ( create_user, get_all_users_json, get_all_users, initialize )
+from App.controllers.leaderboard_controller import rebuild_leaderboard
+from App.controllers.ledger_controller import recompute_student_totals
+from App.controllers.roster_controller import import_roster
+from App.jobs import get_job_runner
+from App.controllers import ( create_user, get_all_users_json, get_all_users, initialize, generate_synthetic_data )
 
 
 '''APP COMMANDS(TESTING PURPOSES)'''
@@ -75,6 +79,44 @@ def listloggedHours():
     listAllloggedHours()
 
 
+#Command to bulk load a deterministic synthetic dataset (used by the benchmarks)
+@app.cli.command ("generateData", help="Bulk loads deterministic synthetic data for benchmarking")
+@click.option("--students", default=1000, help="Number of students")
+@click.option("--staff", default=50, help="Number of staff members")
+@click.option("--logged-hours", default=20000, help="Number of logged hours rows")
+@click.option("--requests", default=5000, help="Number of hour requests")
+@click.option("--activities", default=5000, help="Number of activity logs")
+@click.option("--accolades", default=1000, help="Number of awarded accolades")
+@click.option("--seed", default=42, help="Random seed")
+def generateData(students, staff, logged_hours, requests, activities, accolades, seed):
+    import time
+    started = time.perf_counter()
+    counts = generate_synthetic_data(students=students, staff=staff, logged_hours=logged_hours,
+                                     requests=requests, activities=activities, accolades=accolades, seed=seed)
+    elapsed = time.perf_counter() - started
+    print(f"Generated {sum(counts.values())} rows in {elapsed:.1f}s: {counts}")
+
+
+#Command to rebuild the materialized leaderboard from logged hours and activities
+@app.cli.command ("rebuildLeaderboard", help="Rebuilds the leaderboard from logged hours")
+def rebuildLeaderboard():
+    count = rebuild_leaderboard()
+    print(f"Leaderboard rebuilt for {count} students")
+
+
+#Command to run queued background jobs in their own process
+@app.cli.command ("worker", help="Runs queued background jobs until interrupted")
+@click.option("--threads", default=None, type=int, help="Worker threads (default: JOBS_WORKERS, at least 1)")
+@click.option("--burst", is_flag=True, help="Run the jobs that are due, then exit")
+def worker(threads, burst):
+    runner = get_job_runner()
+    if burst:
+        print(f"Ran {runner.run_pending()} jobs")
+        return
+    print(f"Running jobs on {threads or runner.workers or 1} threads; press Ctrl+C to stop")
+    runner.run_forever(threads)
+
+
 
 '''STUDENT COMMANDS'''
 
@@ -183,6 +225,13 @@ def viewmyAccolades():
     print("\n")
 
 
+#Command to rebuild every student's running totals from their hours, requests and accolades
+@student_cli.command("recomputeTotals", help="Recompute student hour, points, pending and accolade totals")
+def recomputeTotals():
+    count = recompute_student_totals()
+    print(f"Totals recomputed for {count} students")
+
+
 #Student command to view leaderboard of students by approved hours
 @student_cli.command("viewLeaderboard", help="View leaderboard of students by approved hours")
 def student_viewLeaderboard():
@@ -312,6 +361,30 @@ def approveRequest():
 
 
 
+#Command for staff to approve many requests at once (staff_id, comma separated request ids)
+@staff_cli.command("approveRequests", help="Staff approves several requests in one transaction")
+def approveRequests():
+    print("\n")
+    try:
+        staff_id = int(input("Enter your staff ID: "))
+        request_ids = [int(r) for r in input("Enter the request IDs to approve (comma separated): ").split(",") if r.strip()]
+
+        results = process_request_approvals(staff_id, request_ids)
+
+        for result in results:
+            if result['status'] == 'approved':
+                print(f"Request {result['request_id']:<4} approved: {result['hours']} hours for student {result['student_id']}")
+            else:
+                print(f"Request {result['request_id']:<4} skipped: {result['message']}")
+
+    except ValueError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+    print("\n")
+
+
+
 # Command for staff to deny a student's request (staff_id, request_id)
 #change request status to denied, no logged hours created
 @staff_cli.command("denyRequest", help="Staff denies a student's request") 
@@ -340,6 +413,29 @@ def denyRequest():
     print("\n")
 
 
+#Command for staff to bulk import logged hours from a CSV file (student_id, hours[, timestamp])
+@staff_cli.command("importHours", help="Import approved hours from a CSV file")
+@click.argument("file", type=click.Path(exists=True, dir_okay=False))
+def importHours(file):
+    print("\n")
+    try:
+        staff_id = int(input("Enter your staff ID: "))
+        with open(file, newline='', encoding='utf-8-sig') as lines:
+            report = import_logged_hours_csv(staff_id, lines)
+
+        print(f"Imported {report['inserted']} rows in {report['elapsed']:.2f}s ({report['rows_per_sec']:.0f} rows/sec)")
+        if report['rejected']:
+            print(f"Rejected {len(report['rejected'])} rows:")
+            for reject in report['rejected']:
+                print(f"  line {reject['line']}: {reject['reason']}")
+
+    except ValueError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+    print("\n")
+
+
 #staff command to view leaderboard of students by approved hours
 @staff_cli.command("viewLeaderboard", help="View leaderboard of students by approved hours")
 def staff_viewLeaderboard():
@@ -362,6 +458,41 @@ app.cli.add_command(staff_cli) # add the group to the cli
 
 
 
+
+'''USER COMMANDS'''
+
+user_cli = AppGroup('users', help='Commands for students and staff together')
+
+#Command to register a roster of students and staff from a CSV or JSON-lines file (username, email, password[, role])
+@user_cli.command("importRoster", help="Register students and staff from a CSV or JSON-lines roster")
+@click.argument("file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(['csv', 'json']), default=None,
+              help="Roster format (default: from the file extension)")
+@click.option("--processes", default=None, type=int, help="Password hashing processes (default: all cores)")
+def importRoster(file, fmt, processes):
+    print("\n")
+    try:
+        fmt = fmt or ('json' if file.lower().endswith(('.json', '.jsonl', '.ndjson')) else 'csv')
+        with open(file, newline='', encoding='utf-8-sig') as lines:
+            report = import_roster(lines, fmt, processes=processes)
+
+        created = report['created']
+        print(f"Created {created['students']} students and {created['staff']} staff in {report['elapsed']:.2f}s ({report['rows_per_sec']:.0f} rows/sec)")
+        if report['rejected']:
+            print(f"Rejected {len(report['rejected'])} rows:")
+            for reject in report['rejected']:
+                print(f"  line {reject['line']}: {reject['reason']}")
+
+    except ValueError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+    print("\n")
+
+app.cli.add_command(user_cli) # add the group to the cli
+
+
+
 # '''
 # Test Commands
 # '''